@@ -0,0 +1,205 @@
+"""
+bench_soccer_api.py
+
+Benchmarks for the SOCCERAPI load and query paths: load_data on the full and
+light CSVs, get_data with every filter combination, get_unique_values,
+get_squads_by_competition and radar.py's player_list build. Each case is
+timed over several runs, then run once more under tracemalloc for peak
+memory and net allocations. Datasets can be scaled synthetically (10x, 100x
+rows, players renamed per copy) and results are written as JSON so runs on
+different commits can be compared.
+
+    python benchmarks/bench_soccer_api.py --scales 1,10,100
+    python benchmarks/bench_soccer_api.py --compare benchmarks/results/<old>.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from radar import build_player_list, radar_players  # noqa: E402
+from soccer_api import SOCCERAPI  # noqa: E402
+from soccer_store import ColumnarStore  # noqa: E402
+
+FULL_CSV = os.path.join(ROOT, 'players_data-2024_2025.csv')
+LIGHT_CSV = os.path.join(ROOT, 'players_data_light-2024_2025.csv')
+DATA_DIR = os.path.join(ROOT, 'benchmarks', 'data')
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+# One value per get_data filter; every subset of these is benchmarked
+FILTER_VALUES = {
+    'comp': ['es La Liga', 'it Serie A'],
+    'squad': ['Barcelona', 'Real Madrid', 'Inter'],
+    'age_range': (20, 28),
+    'min_minutes': 900,
+    'min_assists': 2,
+}
+
+
+def scaled_csv(source, scale):
+    """ source with its rows repeated scale times (players renamed per copy), written once under DATA_DIR """
+    if scale == 1:
+        return source
+    stem = os.path.splitext(os.path.basename(source))[0]
+    path = os.path.join(DATA_DIR, f'{stem}-x{scale}.csv')
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source):
+        return path
+    os.makedirs(DATA_DIR, exist_ok=True)
+    df = pd.read_csv(source)
+    copies = []
+    for i in range(scale):
+        copy = df.copy()
+        if i:
+            copy['Player'] = copy['Player'] + f' #{i}'
+        copies.append(copy)
+    pd.concat(copies, ignore_index=True).to_csv(path, index=False)
+    return path
+
+
+def measure(fn, setup=None, repeat=5):
+    """ Wall time over repeat runs, then peak memory and net allocations of one traced run """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    diff = tracemalloc.take_snapshot().compare_to(before, 'filename')
+    tracemalloc.stop()
+    del result
+    return {
+        'wall_ms': {'min': min(times), 'median': statistics.median(times), 'max': max(times)},
+        'peak_kb': (peak - base) / 1024,
+        'net_kb': sum(stat.size_diff for stat in diff) / 1024,
+        'net_blocks': sum(stat.count_diff for stat in diff),
+    }
+
+
+def load_cases(path):
+    """ (name, fn, setup) for load_data: CSV parse, first cached load (builds the cache) and warm cached load """
+    def clear_cache():
+        shutil.rmtree(ColumnarStore(path).root, ignore_errors=True)
+
+    def load_cached():
+        api = SOCCERAPI()
+        api.load_data(path)
+        return api
+
+    return [
+        ('load_data csv', lambda: SOCCERAPI(path, cache=False), None),
+        ('load_data cache build', load_cached, clear_cache),
+        ('load_data cache warm', load_cached, None),
+    ]
+
+
+def query_cases(api):
+    """ (name, fn, setup) for the query paths; the result cache is cleared before every run but the last """
+    cases = []
+    for n in range(len(FILTER_VALUES) + 1):
+        for names in itertools.combinations(FILTER_VALUES, n):
+            kwargs = {name: FILTER_VALUES[name] for name in names}
+            label = '+'.join(names) or 'no filters'
+            cases.append((f'get_data {label}', lambda kwargs=kwargs: api.get_data(min_goals=0, **kwargs)))
+    cases += [
+        ('get_unique_values Comp', lambda: api.get_unique_values('Comp')),
+        ('get_unique_values Squad', lambda: api.get_unique_values('Squad')),
+        ('get_squads_by_competition', lambda: api.get_squads_by_competition(FILTER_VALUES['comp'])),
+        ('radar player_list', lambda: build_player_list(radar_players(api))),
+    ]
+    cases = [(name, fn, api.results.clear) for name, fn in cases]
+    # Answered from the result cache, which the setup fills
+    cases.append(('get_data cached hit', lambda: api.get_data(min_goals=5), lambda: api.get_data(min_goals=5)))
+    return cases
+
+
+def run(scales, repeat, include_full):
+    results = []
+    sources = [('light', LIGHT_CSV)] + ([('full', FULL_CSV)] if include_full else [])
+    for scale in scales:
+        for label, source in sources:
+            path = scaled_csv(source, scale)
+            with open(path, encoding='utf-8') as f:
+                rows = sum(1 for _ in f) - 1
+            cases = load_cases(path)
+            if label == 'light':
+                cases += query_cases(SOCCERAPI(path))
+            for name, fn, setup in cases:
+                stats = measure(fn, setup, repeat)
+                results.append({'case': name, 'dataset': label, 'scale': scale, 'rows': rows, **stats})
+                print(f"{label:>5} x{scale:<4} {name:<50} {stats['wall_ms']['median']:>10.2f} ms "
+                      f"{stats['peak_kb']:>12.0f} KB peak")
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'machine': platform.machine(), 'processor': platform.processor()}
+
+
+def compare(old_file, new_results):
+    """ Print median wall time and peak memory ratios against an earlier results file """
+    with open(old_file, encoding='utf-8') as f:
+        old = {(r['case'], r['dataset'], r['scale']): r for r in json.load(f)['results']}
+    print(f"\n{'case':<62} {'time':>8} {'memory':>8}")
+    for r in new_results:
+        before = old.get((r['case'], r['dataset'], r['scale']))
+        if before is None:
+            continue
+        time_ratio = r['wall_ms']['median'] / max(before['wall_ms']['median'], 1e-9)
+        memory_ratio = r['peak_kb'] / max(before['peak_kb'], 1e-9)
+        print(f"{r['dataset']:>5} x{r['scale']:<4} {r['case']:<50} {time_ratio:>7.2f}x {memory_ratio:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SOCCERAPI load and query paths')
+    parser.add_argument('--scales', default='1,10,100', help='comma-separated row multipliers')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-full', action='store_true', help='skip load_data on the full CSV')
+    parser.add_argument('--output', help='results file (default benchmarks/results/<commit>-<time>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    report = {**environment(), 'repeat': args.repeat, 'results': run(scales, args.repeat, not args.no_full)}
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{report['commit'] or 'nocommit'}-{report['timestamp'].replace(':', '')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"✅ Results written to {output}")
+    if args.compare:
+        compare(args.compare, report['results'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+page_assets.py
+
+Helpers for the static HTML pages generated from the player data. Tables are
+shipped to the browser in a compact columnar form: text columns are
+dictionary-encoded and numeric columns are base64-packed typed arrays, which
+the page decodes with JS_DECODER. Data that is only needed on demand is
+written as separate shard scripts that call a page-defined callback, so the
+pages also work when opened straight from disk (file://). Search boxes use
+a prebuilt n-gram index (build_search_index / JS_SEARCH) instead of scanning
+every name on each keystroke.
+
+Scripts and data files are written with a content hash in their name
+(write_hashed), so browsers can cache them indefinitely and pages that share
+them - the local Plotly bundle, the decoder/search helpers - load one copy.
+"""
+import base64
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+ASSET_DIRNAME = 'assets'
+PLOTLY_CDN = 'https://cdn.plot.ly/plotly-latest.min.js'
+HASH_LENGTH = 12
+
+# numpy dtype -> JavaScript typed array constructor
+JS_ARRAY_TYPES = {'int8': 'Int8Array', 'uint8': 'Uint8Array', 'int16': 'Int16Array', 'uint16': 'Uint16Array',
+                  'int32': 'Int32Array', 'uint32': 'Uint32Array', 'float32': 'Float32Array', 'float64': 'Float64Array'}
+
+JS_DECODER = """
+const JS_ARRAY_TYPES = {int8: Int8Array, uint8: Uint8Array, int16: Int16Array, uint16: Uint16Array,
+                        int32: Int32Array, uint32: Uint32Array, float32: Float32Array, float64: Float64Array};
+
+function decodeArray(spec) {
+    const binary = atob(spec.data);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+    return new JS_ARRAY_TYPES[spec.dtype](bytes.buffer);
+}
+
+function decodeTable(table) {
+    const columns = {};
+    for (const [name, spec] of Object.entries(table.columns)) {
+        if (Array.isArray(spec)) {
+            columns[name] = spec;
+        } else if (spec.dict) {
+            const codes = decodeArray(spec.codes);
+            columns[name] = Array.from(codes, code => code < 0 ? null : spec.dict[code]);
+        } else {
+            columns[name] = decodeArray(spec);
+        }
+    }
+    return {length: table.length, columns: columns};
+}
+"""
+
+# Accent-folding must match fold_text() below character for character
+JS_SEARCH = """
+function foldText(text) {
+    return text.normalize('NFD').replace(/[\\u0300-\\u036f]/g, '').toLowerCase();
+}
+
+// Prebuilt n-gram index: trigrams of each folded key plus '^'-marked 1-2 character
+// word prefixes. Queries of 3+ characters match substrings, shorter ones word starts.
+function SearchIndex(spec, keys) {
+    this.grams = new Map(spec.grams.map((gram, i) => [gram, i]));
+    this.offsets = decodeArray(spec.offsets);
+    this.ids = decodeArray(spec.ids);
+    this.keys = keys.map(key => foldText(key || ''));
+}
+
+SearchIndex.prototype.postings = function(gram) {
+    const i = this.grams.get(gram);
+    return i === undefined ? this.ids.subarray(0, 0) : this.ids.subarray(this.offsets[i], this.offsets[i + 1]);
+};
+
+// Ids (ascending) of keys matching query
+SearchIndex.prototype.search = function(query) {
+    const folded = foldText(query);
+    if (folded.length < 3) return this.postings('^' + folded);
+    let best = null;
+    for (let i = 0; i + 3 <= folded.length; i++) {
+        const list = this.postings(folded.slice(i, i + 3));
+        if (list.length === 0) return list;
+        if (best === null || list.length < best.length) best = list;
+    }
+    return best.filter(id => this.keys[id].includes(folded));
+};
+
+// First `limit` distinct values across ascending lists, in ascending order
+function mergeAscending(lists, limit) {
+    const heads = lists.map(() => 0);
+    const result = [];
+    while (result.length < limit) {
+        let min = Infinity, which = -1;
+        lists.forEach((list, k) => {
+            if (heads[k] < list.length && list[heads[k]] < min) { min = list[heads[k]]; which = k; }
+        });
+        if (which < 0) break;
+        if (result[result.length - 1] !== min) result.push(min);
+        heads[which]++;
+    }
+    return result;
+}
+"""
+
+
+def fold_text(text):
+    """ Lower-case text with accents removed ('Mbappé' -> 'mbappe'), as the page's foldText does """
+    decomposed = unicodedata.normalize('NFD', str(text))
+    return re.sub(r'[\u0300-\u036f]', '', decomposed).lower()
+
+
+def build_search_index(keys):
+    """ N-gram index over keys for SearchIndex in JS_SEARCH
+
+    Each folded key contributes its trigrams and the first one and two
+    characters of every word (marked with '^'). Postings are key positions in
+    ascending order, shipped as one typed array plus offsets.
+    """
+    postings = defaultdict(list)
+    for i, key in enumerate(keys):
+        folded = fold_text(key) if key is not None else ''
+        grams = {folded[j:j + 3] for j in range(len(folded) - 2)}
+        for word in folded.split():
+            grams.update('^' + word[:n] for n in (1, 2) if len(word) >= n)
+        for gram in grams:
+            postings[gram].append(i)
+    grams = sorted(postings)
+    offsets = np.cumsum([0] + [len(postings[gram]) for gram in grams])
+    ids = np.concatenate([postings[gram] for gram in grams]) if grams else np.empty(0)
+    id_dtype = np.uint16 if len(keys) <= np.iinfo(np.uint16).max else np.uint32
+    offset_dtype = np.uint16 if offsets[-1] <= np.iinfo(np.uint16).max else np.uint32
+    return {'grams': grams, 'offsets': encode_array(offsets, offset_dtype), 'ids': encode_array(ids, id_dtype)}
+
+
+def slugify(name):
+    """ File-name-safe version of a label such as 'eng Premier League' """
+    return re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-')
+
+
+def encode_array(values, dtype):
+    """ Base64-encode values as a little-endian typed array """
+    array = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<'))
+    return {'dtype': np.dtype(dtype).name, 'data': base64.b64encode(array.tobytes()).decode('ascii')}
+
+
+def _code_dtype(n_values):
+    for dtype in (np.int8, np.int16):
+        if n_values <= np.iinfo(dtype).max:
+            return dtype
+    return np.int32
+
+
+def encode_table(df, dict_columns=(), text_columns=(), dtypes=None):
+    """ Columnar encoding of df for the browser
+
+    dict_columns are dictionary-encoded (values list plus integer codes),
+    text_columns are shipped as plain string lists and every other column is a
+    typed numeric array (float32 unless dtypes maps the column to another dtype).
+    """
+    dtypes = dtypes or {}
+    columns = {}
+    for name in df.columns:
+        col = df[name]
+        if name in dict_columns:
+            codes, uniques = pd.factorize(col, sort=True)
+            columns[name] = {'dict': [str(value) for value in uniques],
+                             'codes': encode_array(codes, _code_dtype(len(uniques)))}
+        elif name in text_columns:
+            columns[name] = [None if pd.isna(value) else str(value) for value in col]
+        else:
+            columns[name] = encode_array(col.to_numpy(dtype=np.float64, na_value=np.nan), dtypes.get(name, 'float32'))
+    return {'length': len(df), 'columns': columns}
+
+
+def to_js_literal(payload):
+    """ JSON text that is also safe to embed inside a <script> element """
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).replace('</', '<\\/')
+
+
+def write_hashed(directory, stem, ext, content):
+    """ Write content to directory/stem-<hash>ext unless it already exists; returns the path
+
+    Older versions (same stem and extension, different hash) are removed.
+    """
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    path = os.path.join(directory, f'{stem}-{digest}{ext}')
+    if os.path.exists(path):
+        return path
+    os.makedirs(directory or '.', exist_ok=True)
+    # Write then rename, so parallel writers never expose a partial file
+    partial = f'{path}.{os.getpid()}.tmp'
+    with open(partial, 'wb') as f:
+        f.write(data)
+    os.replace(partial, path)
+    stale = re.compile(re.escape(stem) + r'-[0-9a-f]{%d}' % HASH_LENGTH + re.escape(ext) + '$')
+    for name in os.listdir(directory or '.'):
+        if stale.match(name) and name != os.path.basename(path):
+            os.remove(os.path.join(directory, name))
+    return path
+
+
+def write_shard(directory, stem, callback, key, payload):
+    """ Write a data shard as a content-hashed script calling window[callback](key, payload) """
+    return write_hashed(directory, stem, '.js', f'window.{callback}({to_js_literal(key)}, {to_js_literal(payload)});\n')
+
+
+def write_data_script(directory, stem, name, payload):
+    """ Write a content-hashed script that sets window[name] = payload """
+    return write_hashed(directory, stem, '.js', f'window.{name} = {to_js_literal(payload)};\n')
+
+
+def write_page_helpers(asset_dir=ASSET_DIRNAME):
+    """ Shared script with JS_DECODER and JS_SEARCH """
+    return write_hashed(asset_dir, 'page-helpers', '.js', JS_DECODER + JS_SEARCH)
+
+
+def plotly_bundle(asset_dir=ASSET_DIRNAME):
+    """ Local, content-hashed copy of the plotly.js library the installed plotly package ships """
+    from plotly.offline import get_plotlyjs
+    return write_hashed(asset_dir, 'plotly', '.min.js', get_plotlyjs())
+
+
+def page_src(path, page_file):
+    """ URL of path relative to the page that loads it """
+    return os.path.relpath(path, os.path.dirname(page_file) or '.').replace(os.sep, '/')
@@ -3,100 +3,152 @@ Create an interactive radar chart comparison with player selection dropdowns
 """
 import pandas as pd
 import webbrowser
-from soccer_api import SOCCERAPI
+from page_assets import (PLOTLY_CDN, build_search_index, encode_table, page_src, plotly_bundle, slugify,
+                         write_data_script, write_page_helpers, write_shard)
+from soccer_api import SOCCERAPI, required_columns
+from soccer_normalize import STAT_GROUPS
 
-# Initialize API and load data
-soccerapi = SOCCERAPI("players_data-2024_2025.csv")
+# 'local' writes one content-hashed copy of plotly.js under assets/ that every generated
+# page shares (works without network access); 'cdn' links the Plotly CDN instead
+plotly_js = 'local'
 
-# Get filtered data (adjust these parameters as needed)
-df = soccerapi.get_data(
-    min_goals=0,
-    min_assists=0,
-    comp=None,  # Or specify leagues: ['Premier League', 'La Liga']
-    squad=None,  # Or specify squads: ['Manchester City', 'Real Madrid']
-    age_range=(18, 35),
-    min_minutes=500
-)
+# Only need attacking stats
+attack_stats = STAT_GROUPS['ATTACK']
+
+
+def radar_players(api):
+    """ Season totals of the players offered in the radar (adjust these parameters as needed) """
+    return api.get_data(
+        min_goals=0,
+        min_assists=0,
+        comp=None,  # Or specify leagues: ['Premier League', 'La Liga']
+        squad=None,  # Or specify squads: ['Manchester City', 'Real Madrid']
+        age_range=(18, 35),
+        min_minutes=500,
+        level='player'  # Season totals, so players who changed clubs are counted once
+    )
+
+
+def build_player_list(df):
+    """ All players of df with their positions (position and squad from the club they played most for) """
+    first_rows = df.drop_duplicates('Player')
+    player_list = []
+    for player, squad, pos in zip(first_rows['Player'], first_rows['Squad'], first_rows['Pos']):
+        player_list.append({
+            'name': player,
+            'pos': pos if pos else 'Unknown',
+            'squad': squad
+        })
+
+    # Sort players alphabetically
+    return sorted(player_list, key=lambda x: x['name'])
 
-# Get list of all players with their positions
-player_list = []
-for player in df['Player'].unique():
-    pos = soccerapi.get_player_position(player)
-    squad = df[df['Player'] == player]['Squad'].iloc[0]
-    player_list.append({
-        'name': player,
-        'pos': pos if pos else 'Unknown',
-        'squad': squad
-    })
 
-# Sort players alphabetically
-player_list = sorted(player_list, key=lambda x: x['name'])
 # Define position categories and stats
 def get_position_category(pos):
     return {'FW': 'ATTACK', 'MF': 'ATTACK', 'DF': 'DEFENSE', 'GK': 'GOALKEEPER'}.get(pos, 'ATTACK')
 
-# Add position category to each player
-for player in player_list:
-    player['category'] = get_position_category(player['pos'])
 
-# Define stats based on position
-stats_config = {
-    'ATTACK': {
-        'cols': ['Min', 'Gls', 'Ast', 'KP', 'PrgC'],
-        'title': '⚡ Attacking Player Comparison'},
-    'DEFENSE': {
-        'cols': ['Min', 'Tkl', 'TklW', 'Blocks', 'Int', 'Clr'],
-        'title': '🛡️ Defensive Player Comparison'},
-    'GOALKEEPER': {
-        'cols': ['Min', 'GA', 'Saves', 'Save%', 'CS'],
-        'title': '🧤 Goalkeeper Comparison'}
-}
+if __name__ == '__main__':
+    # Initialize API and load only the columns the radar uses
+    soccerapi = SOCCERAPI("players_data-2024_2025.csv",
+                          columns=required_columns(stats=attack_stats), compact=True)
 
-# Display names for stats
-stat_display_names = {
-    'Min': 'Minutes Played',
-    'Gls': 'Goals',
-    'Ast': 'Assists',
-    'KP': 'Key Passes',
-    'PrgC': 'Progressive Carries',
-    'Tkl': 'Tackles',
-    'TklW': 'Tackles Won',
-    'Blocks': 'Blocks',
-    'Int': 'Interceptions',
-    'Clr': 'Clearances',
-    'GA': 'Goals Against',
-    'Saves': 'Saves',
-    'Save%': 'Save Percentage',
-    'CS': 'Clean Sheets'
-}
+    df = radar_players(soccerapi)
+    first_rows = df.drop_duplicates('Player')
+    player_list = build_player_list(df)
 
-# Normalize data function
-def normalize_dataframe(df_input, cols, scale_min=0, scale_max=100):
-    normalized = df_input.copy()
-    for col in cols:
-        col_max, col_min = df_input[col].max(), df_input[col].min()
-        if col_max != col_min:
-            normalized[col] = ((df_input[col] - col_min) / (col_max - col_min)) * (scale_max - scale_min) + scale_min
-        else:
-            normalized[col] = scale_min
-    return normalized
+    # Add position category to each player
+    for player in player_list:
+        player['category'] = get_position_category(player['pos'])
 
-# Only need attacking stats
-attack_stats = ['Min', 'Gls', 'Ast', 'KP', 'PrgC']
-normalized_df = normalize_dataframe(df, attack_stats)
+    # Define stats based on position
+    stats_config = {
+        'ATTACK': {
+            'cols': STAT_GROUPS['ATTACK'],
+            'title': '⚡ Attacking Player Comparison'},
+        'DEFENSE': {
+            'cols': STAT_GROUPS['DEFENSE'],
+            'title': '🛡️ Defensive Player Comparison'},
+        'GOALKEEPER': {
+            'cols': STAT_GROUPS['GOALKEEPER'],
+            'title': '🧤 Goalkeeper Comparison'}
+    }
+
+    # Display names for stats
+    stat_display_names = {
+        'Min': 'Minutes Played',
+        'Gls': 'Goals',
+        'Ast': 'Assists',
+        'KP': 'Key Passes',
+        'PrgC': 'Progressive Carries',
+        'Tkl': 'Tackles',
+        'TklW': 'Tackles Won',
+        'Blocks': 'Blocks',
+        'Int': 'Interceptions',
+        'Clr': 'Clearances',
+        'GA': 'Goals Against',
+        'Saves': 'Saves',
+        'Save%': 'Save Percentage',
+        'CS': 'Clean Sheets'
+    }
 
-# Convert dataframes to JSON for JavaScript
-df_json = df.to_json(orient='records')
-normalized_df_json = normalized_df.to_json(orient='records')
-player_list_json = str(player_list).replace("'", '"')
+    # Min-max scale against the whole dataset so scales do not shift with the filter
+    normalized_df = soccerapi.normalize(df, attack_stats, method='minmax', level='player')
 
-# Create the HTML with embedded JavaScript
-html_content = f"""
+    # Output locations: the page loads one compact row per player from a data script, and
+    # the actual stat values are split into per-league shards loaded when a player is picked.
+    # Every script has a content hash in its name, so browsers can cache it indefinitely.
+    output_file = "attacking_players_radar.html"
+    data_dir = "attacking_players_radar_data"
+
+    # One radar row per player (their season totals), in player_list order
+    first_row_of = pd.Series(first_rows.index, index=first_rows['Player'])
+    core_rows = first_row_of.loc[[player['name'] for player in player_list]].to_numpy()
+    core_df = pd.DataFrame({
+        'Player': [player['name'] for player in player_list],
+        'Squad': [player['squad'] for player in player_list],
+        'Pos': [player['pos'] for player in player_list],
+        'League': df.loc[core_rows, 'Comp'].astype(str).to_numpy(),
+    })
+    for col in attack_stats:
+        core_df[col] = normalized_df.loc[core_rows, col].to_numpy()
+    core_table = encode_table(core_df, dict_columns=['Squad', 'Pos', 'League'], text_columns=['Player'])
+
+    # Prebuilt autocomplete index over player names and squad names
+    squad_names = sorted(core_df['Squad'].unique())
+    search_spec = {
+        'names': build_search_index(core_df['Player']),
+        'squads': squad_names,
+        'squadIndex': build_search_index(squad_names),
+    }
+
+    # Per-league shards with the actual stat values, keyed by core row
+    shard_files = {}
+    for league in core_df['League'].unique():
+        rows = (core_df['League'] == league).to_numpy().nonzero()[0]
+        shard_df = pd.DataFrame({'row': rows})
+        for col in attack_stats:
+            shard_df[col] = df.loc[core_rows[rows], col].to_numpy()
+        shard_path = write_shard(data_dir, slugify(league), 'onRadarShard', league,
+                                 encode_table(shard_df, dtypes={'row': 'int32'}))
+        shard_files[league] = page_src(shard_path, output_file)
+
+    # Page data, shared helper scripts and the Plotly library as separate cacheable files
+    data_src = page_src(write_data_script(data_dir, 'core', 'radarData',
+                                          {'core': core_table, 'search': search_spec, 'shards': shard_files}), output_file)
+    helpers_src = page_src(write_page_helpers(), output_file)
+    plotly_src = page_src(plotly_bundle(), output_file) if plotly_js == 'local' else PLOTLY_CDN
+
+    # Create the HTML with embedded JavaScript
+    html_content = f"""
 <!DOCTYPE html>
 <html>
 <head>
     <title>⚽ Attacking Players Radar Comparison</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    <script src="{plotly_src}"></script>
+    <script src="{helpers_src}"></script>
+    <script src="{data_src}"></script>
     <style>
         body {{
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
@@ -225,10 +277,45 @@ html_content = f"""
     </div>
 
     <script>
-        // Data from Python
-        const playerData = {df_json};
-        const normalizedData = {normalized_df_json};
-        const playerList = {player_list_json};
+        // Data from Python (radarData script): one row per player with normalized radar stats
+        const radarCore = decodeTable(radarData.core);
+        const coreColumns = radarCore.columns;
+        const playerList = coreColumns.Player.map((name, row) => ({{
+            name: name, squad: coreColumns.Squad[row], pos: coreColumns.Pos[row], row: row
+        }}));
+        const playerRow = new Map(playerList.map(player => [player.name, player.row]));
+        
+        // Autocomplete index: name n-grams, squad n-grams and the rows of each squad
+        const search = radarData.search;
+        const nameIndex = new SearchIndex(search.names, coreColumns.Player);
+        const squadIndex = new SearchIndex(search.squadIndex, search.squads);
+        const squadRows = new Map(search.squads.map(squad => [squad, []]));
+        coreColumns.Squad.forEach((squad, row) => squadRows.get(squad).push(row));
+        
+        // Actual stat values live in per-league shards, loaded on demand
+        const shardFiles = radarData.shards;
+        const actualStats = new Map();
+        const shardRequests = {{}};
+        window.onRadarShard = function(league, table) {{
+            const shard = decodeTable(table).columns;
+            shard.row.forEach((row, i) => {{
+                actualStats.set(row, statCols.map(col => shard[col][i]));
+            }});
+        }};
+        
+        function loadShard(league) {{
+            if (!shardRequests[league]) {{
+                shardRequests[league] = new Promise((resolve, reject) => {{
+                    const script = document.createElement('script');
+                    script.src = shardFiles[league];
+                    script.onload = resolve;
+                    script.onerror = reject;
+                    document.head.appendChild(script);
+                }});
+            }}
+            return shardRequests[league];
+        }}
+        let chartRequest = 0;
         
         // Attacking stats configuration
         const statCols = ['Min', 'Gls', 'Ast', 'KP', 'PrgC'];
@@ -249,49 +336,52 @@ html_content = f"""
             messageDiv.innerHTML = `<div class="info">${{text}}</div>`;
         }}
         
-        function filterPlayers(searchText) {{
-            if (!searchText) return playerList;
-            const lower = searchText.toLowerCase();
-            return playerList.filter(player => 
-                player.name.toLowerCase().includes(lower) ||
-                player.squad.toLowerCase().includes(lower)
-            );
+        function filterPlayers(searchText, limit) {{
+            if (!searchText) return playerList.slice(0, limit);
+            // Rows are in alphabetical order, so merging the ascending match lists keeps that order
+            const lists = [nameIndex.search(searchText)];
+            squadIndex.search(searchText).forEach(id => lists.push(squadRows.get(search.squads[id])));
+            return mergeAscending(lists, limit).map(row => playerList[row]);
         }}
         
         function showSuggestions(inputElement, suggestionsElement, searchText) {{
-            const filtered = filterPlayers(searchText);
+            const filtered = filterPlayers(searchText, 10);
             
             if (filtered.length === 0 || !searchText) {{
                 suggestionsElement.style.display = 'none';
                 return;
             }}
             
-            suggestionsElement.innerHTML = filtered.slice(0, 10).map(player => `
-                <div class="suggestion-item" data-player="${{player.name}}">
+            suggestionsElement.innerHTML = filtered.map(player => `
+                <div class="suggestion-item" data-row="${{player.row}}">
                     <div>${{player.name}}</div>
                     <div class="player-info">${{player.squad}} • ${{player.pos}}</div>
                 </div>
             `).join('');
             
             suggestionsElement.style.display = 'block';
-            
-            // Add click handlers
-            suggestionsElement.querySelectorAll('.suggestion-item').forEach(item => {{
-                item.addEventListener('click', () => {{
-                    const playerName = item.getAttribute('data-player');
-                    inputElement.value = playerName;
-                    suggestionsElement.style.display = 'none';
-                    
-                    if (inputElement === player1Input) {{
-                        selectedPlayer1 = playerName;
-                    }} else {{
-                        selectedPlayer2 = playerName;
-                    }}
-                    
-                    updateChart();
-                }});
+        }}
+        
+        // One delegated click handler per suggestion list, attached once
+        function handleSuggestionClicks(inputElement, suggestionsElement) {{
+            suggestionsElement.addEventListener('click', (e) => {{
+                const item = e.target.closest('.suggestion-item');
+                if (!item) return;
+                const playerName = playerList[+item.getAttribute('data-row')].name;
+                inputElement.value = playerName;
+                suggestionsElement.style.display = 'none';
+                
+                if (inputElement === player1Input) {{
+                    selectedPlayer1 = playerName;
+                }} else {{
+                    selectedPlayer2 = playerName;
+                }}
+                
+                updateChart();
             }});
         }}
+        handleSuggestionClicks(player1Input, suggestions1);
+        handleSuggestionClicks(player2Input, suggestions2);
         
         function updateChart() {{
             const selectedPlayers = [selectedPlayer1, selectedPlayer2].filter(p => p);
@@ -305,15 +395,21 @@ html_content = f"""
             // Clear message
             document.getElementById('message').innerHTML = '';
             
-            // Create traces
+            // Create traces once the shards for the selected players' leagues are loaded
+            const rows = selectedPlayers.map(playerName => playerRow.get(playerName)).filter(row => row !== undefined);
+            const request = ++chartRequest;
+            Promise.all(rows.map(row => loadShard(coreColumns.League[row]))).then(() => {{
+                if (request === chartRequest) drawChart(selectedPlayers);
+            }});
+        }}
+        
+        function drawChart(selectedPlayers) {{
             const traces = selectedPlayers.map(playerName => {{
-                const normRow = normalizedData.find(row => row.Player === playerName);
-                const actualRow = playerData.find(row => row.Player === playerName);
-                
-                if (!normRow || !actualRow) return null;
+                const row = playerRow.get(playerName);
+                if (row === undefined || !actualStats.has(row)) return null;
                 
-                const normValues = statCols.map(col => normRow[col]);
-                const actualValues = statCols.map(col => actualRow[col]);
+                const normValues = statCols.map(col => coreColumns[col][row]);
+                const actualValues = actualStats.get(row);
                 const hoverText = displayNames.map((name, i) => 
                     `${{name}}: ${{actualValues[i].toFixed(1)}}`
                 );
@@ -398,14 +494,15 @@ html_content = f"""
 </html>
 """
 
-# Save and open
-output_file = "attacking_players_radar.html"
-with open(output_file, 'w', encoding='utf-8') as f:
-    f.write(html_content)
+    # Save and open
+    with soccerapi.span('write_page'), open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html_content)
 
-# Automatically open in browser
-webbrowser.open(output_file)
+    # Automatically open in browser
+    webbrowser.open(output_file)
 
-print(f"✅ Interactive attacking players radar chart opened in browser!")
-print(f"   File saved: {output_file}")
-print(f"   Total attacking players available: {len(player_list)}")
\ No newline at end of file
+    print(f"✅ Interactive attacking players radar chart opened in browser!")
+    print(f"   File saved: {output_file} (data shards in {data_dir}/)")
+    print(f"   Total attacking players available: {len(player_list)}")
+    if soccerapi.profiler is not None:
+        print(soccerapi.profiler.report())
\ No newline at end of file
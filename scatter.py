@@ -1,151 +1,30 @@
-import pandas as pd
-import plotly.graph_objects as go
 import webbrowser
+from scatter_batch import LEAGUE_NAMES, build_figure, detail_tiles, write_page
+from soccer_api import SOCCERAPI, required_columns
 
-# === Load your dataset ===
-df = pd.read_csv("players_data-2024_2025.csv")
+# 'local' writes one content-hashed copy of plotly.js under assets/ shared with the other
+# generated pages and puts the figure in soccer_analytics_plot_data/; 'cdn' inlines the figure
+plotly_js = 'local'
 
-# === Filter players ===
-df = df[(df["Min"] >= 500) & (df["Gls"] >= 5)]
-
-# Rename leagues
-df['League'] = df['Comp'].map({
-    'eng Premier League': 'Premier League',
-    'es La Liga': 'La Liga',
-    'it Serie A': 'Serie A',
-    'de Bundesliga': 'Bundesliga',
-    'fr Ligue 1': 'Ligue 1'
-})
-
-league_colors = {
-    'Premier League': '#9B4DB8',
-    'La Liga': '#FF4C4C',
-    'Serie A': '#0086D4',
-    'Bundesliga': '#B00020',
-    'Ligue 1': '#0B3A78',
-}
-
-# === Create figure ===
-fig = go.Figure()
-
-# Add traces for each league
-for league in df['League'].unique():
-    league_data = df[df['League'] == league]
+# === Load your dataset (only the columns this plot uses) ===
+soccerapi = SOCCERAPI("players_data-2024_2025.csv",
+                      columns=required_columns(stats=['xG', 'Age'], filters=[]), compact=True)
 
-    fig.add_trace(go.Scatter(
-        x=league_data['Gls'],
-        y=league_data['xG'],
-        mode='markers',
-        name=league,  # ✅ This name appears in the built-in legend
-        marker=dict(
-            color=league_colors[league],
-            size=10,
-            line=dict(width=1, color='white'),
-            opacity=0.8
-        ),
-        hovertemplate=(
-            '<b>%{customdata[0]}</b><br>' +
-            'Team: %{customdata[1]}<br>' +
-            'Age: %{customdata[2]}<br>' +
-            'Goals: %{x}<br>' +
-            'xG: %{y:.2f}<br>' +
-            'Assists: %{customdata[3]}<br>' +
-            '<extra></extra>'
-        ),
-        customdata=league_data[['Player', 'Squad', 'Age', 'Ast']].values,
-        showlegend=True  # ✅ show in Plotly legend
-    ))
-
-# Add reference line (Goals = xG)
-fig.add_shape(
-    type="line",
-    x0=df["Gls"].min(),
-    y0=df["Gls"].min(),
-    x1=df["Gls"].max(),
-    y1=df["Gls"].max(),
-    line=dict(color="rgba(0,0,0,0.2)", width=2, dash="dash"),
-)
+# === Filter players ===
+df = soccerapi.get_data(min_goals=5, min_minutes=500)
+df['League'] = df['Comp'].map(LEAGUE_NAMES)
 
-# === Layout with built-in legend and y-axis fully visible ===
-fig.update_layout(
-    title={
-        'text': "⚽ Goals vs Expected Goals<br><sub>Players with ≥500 min & ≥5 goals</sub>",
-        'x': 0.5,
-        'xanchor': 'center'
-    },
-    xaxis=dict(
-        title="Goals (Gls)",
-        showgrid=True,
-        gridcolor='rgba(0,0,0,0.05)',
-        automargin=True
-    ),
-    yaxis=dict(
-        title=dict(
-            text="Expected Goals (xG)",
-            standoff=20
-        ),
-        showgrid=True,
-        gridcolor='rgba(0,0,0,0.05)',
-        automargin=True
-    ),
-    plot_bgcolor="#f9f9f9",
-    paper_bgcolor="#f0f2f5",
-    font=dict(family="Segoe UI, sans-serif", size=14),
-    margin=dict(l=80, r=40, t=120, b=80),
-    hovermode='closest',
-    showlegend=True,  # ✅ enable built-in legend
-    legend=dict(
-        title="League",
-        orientation="h",   # horizontal legend
-        x=0.5,
-        xanchor='center',
-        y=-0.15,          # below the plot
-        font=dict(size=12)
-    ),
-    height=1000
-)
+# === Create figure (one trace per league, y = x reference line; binned counts for very large selections) ===
+fig = build_figure(df, 'Gls', 'xG', subtitle="Players with ≥500 min & ≥5 goals")
+tiles = detail_tiles(df, 'Gls', 'xG')
 
 # === Export HTML ===
 output_file = "soccer_analytics_plot.html"
 
-plotly_html = fig.to_html(
-    include_plotlyjs="cdn",
-    full_html=False,
-    config={"responsive": True, "displayModeBar": True, "displaylogo": False}
-)
-
-custom_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        body {{
-            margin: 0;
-            padding: 20px;
-            font-family: 'Segoe UI', sans-serif;
-            background: #f0f2f5;
-        }}
-        .plot-container {{
-            width: 100%;
-            min-width: 1200px;  /* ensures y-axis label fits */
-            margin: 0 auto;
-            height: 1000px;
-            overflow: visible;
-        }}
-    </style>
-</head>
-<body>
-    <div class="plot-container">
-        {plotly_html}
-    </div>
-</body>
-</html>
-"""
-
-with open(output_file, 'w', encoding='utf-8') as f:
-    f.write(custom_html)
+with soccerapi.span('write_page'):
+    write_page(fig, output_file, plotly_js, tiles=tiles)
 
 webbrowser.open(output_file)
 print(f"✅ Plot saved and opened: {output_file}")
+if soccerapi.profiler is not None:
+    print(soccerapi.profiler.report())
@@ -0,0 +1,574 @@
+"""
+scatter_batch.py
+
+Batch rendering of scatter plot variants (league x position group x minute
+threshold x stat pair). One SOCCERAPI dataset is loaded and split by league
+and position group in a single groupby pass; each spec takes its groups from
+that split, and changed figures are rendered across a process pool. A spec is
+skipped when the hash of its inputs (spec, data and this module's code)
+matches the one recorded in the output directory's manifest. Pages share one
+local plotly.js bundle and load their figure from a content-hashed data file.
+
+Large plots are rendered by level of detail: above WEBGL_THRESHOLD points
+the markers are drawn with WebGL, and above BIN_THRESHOLD the page shows a
+heatmap of player counts per 2D bin (computed here, not in the browser) and
+loads the individual players of the visible tiles once a zoom narrows the
+view to at most DRILL_POINTS of them.
+
+    python scatter_batch.py --out scatter_plots --workers 4
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+import page_assets
+from page_assets import (ASSET_DIRNAME, PLOTLY_CDN, encode_table, page_src, plotly_bundle, slugify,
+                         write_data_script, write_hashed, write_page_helpers, write_shard)
+from soccer_api import SOCCERAPI, required_columns
+from soccer_normalize import position_groups
+
+LEAGUE_NAMES = {
+    'eng Premier League': 'Premier League',
+    'es La Liga': 'La Liga',
+    'it Serie A': 'Serie A',
+    'de Bundesliga': 'Bundesliga',
+    'fr Ligue 1': 'Ligue 1'
+}
+
+LEAGUE_COLORS = {
+    'Premier League': '#9B4DB8',
+    'La Liga': '#FF4C4C',
+    'Serie A': '#0086D4',
+    'Bundesliga': '#B00020',
+    'Ligue 1': '#0B3A78',
+}
+
+STAT_LABELS = {
+    'Gls': 'Goals', 'Ast': 'Assists', 'xG': 'Expected Goals', 'xAG': 'Expected Assisted Goals',
+    'npxG': 'Non-Penalty xG', 'Sh': 'Shots', 'KP': 'Key Passes', 'SCA': 'Shot-Creating Actions',
+    'PrgC': 'Progressive Carries', 'PrgP': 'Progressive Passes', 'Tkl': 'Tackles', 'Int': 'Interceptions',
+}
+
+# Short names used in hover text
+HOVER_NAMES = {'Gls': 'Goals', 'Ast': 'Assists'}
+
+# Pairs measured in the same unit get a y = x reference line
+DIAGONAL_PAIRS = {('Gls', 'xG'), ('xG', 'Gls'), ('Ast', 'xAG'), ('xAG', 'Ast'), ('Gls', 'npxG')}
+
+DEFAULT_STAT_PAIRS = [('Gls', 'xG'), ('Ast', 'xAG'), ('Sh', 'Gls'), ('KP', 'Ast'), ('PrgC', 'PrgP')]
+DEFAULT_MIN_MINUTES = [0, 500, 1000, 2000]
+MANIFEST_NAME = 'manifest.json'
+PLOT_CONFIG = {"responsive": True, "displayModeBar": True, "displaylogo": False}
+
+# Level of detail: WebGL markers above WEBGL_THRESHOLD points, binned counts above BIN_THRESHOLD
+WEBGL_THRESHOLD = 1000
+BIN_THRESHOLD = 5000
+BIN_GRID = 60
+# Players are shipped in TILE_GRID x TILE_GRID tiles and drawn once the view holds at most DRILL_POINTS
+TILE_GRID = 8
+DRILL_POINTS = 4000
+
+# Drill-down for binned plots: when the zoomed view covers few enough players, the tiles
+# overlapping it are loaded (content-hashed shard scripts) and drawn as WebGL markers
+JS_SCATTER_LOD = """
+(function() {
+    const lod = window.scatterTiles;
+    const plot = document.getElementById('scatter-plot');
+    const tiles = new Map();
+    const requests = {};
+    let drawn = '';
+    let timer = null;
+
+    window.onScatterTile = function(key, table) {
+        tiles.set(key, decodeTable(table).columns);
+    };
+
+    function loadTile(key) {
+        if (!requests[key]) {
+            requests[key] = new Promise((resolve, reject) => {
+                const script = document.createElement('script');
+                script.src = lod.shards[key];
+                script.onload = resolve;
+                script.onerror = reject;
+                document.head.appendChild(script);
+            });
+        }
+        return requests[key];
+    }
+
+    // First and last tile overlapping an axis range (every tile when autoranged)
+    function tileSpan(edges, axis) {
+        const last = edges.length - 2;
+        if (axis.autorange || !axis.range) return [0, last];
+        const lo = Math.min(axis.range[0], axis.range[1]), hi = Math.max(axis.range[0], axis.range[1]);
+        let first = 0, end = last;
+        while (first < last && edges[first + 1] < lo) first++;
+        while (end > first && edges[end] > hi) end--;
+        return [first, end];
+    }
+
+    function visibleTiles() {
+        const [i0, i1] = tileSpan(lod.xEdges, plot.layout.xaxis);
+        const [j0, j1] = tileSpan(lod.yEdges, plot.layout.yaxis);
+        const keys = [];
+        let total = 0;
+        for (let i = i0; i <= i1; i++) {
+            for (let j = j0; j <= j1; j++) {
+                const key = i + '_' + j;
+                if (lod.counts[key]) {
+                    keys.push(key);
+                    total += lod.counts[key];
+                }
+            }
+        }
+        return {keys: keys, total: total};
+    }
+
+    function pointTraces(keys) {
+        const leagues = new Map();
+        keys.forEach(key => {
+            const tile = tiles.get(key);
+            tile[lod.x].forEach((x, i) => {
+                const league = tile.League[i] || 'Other';
+                if (!leagues.has(league)) leagues.set(league, {x: [], y: [], customdata: []});
+                const points = leagues.get(league);
+                points.x.push(x);
+                points.y.push(tile[lod.y][i]);
+                points.customdata.push([tile.Player[i], tile.Squad[i], tile.Age[i], tile.Ast[i]]);
+            });
+        });
+        return Array.from(leagues, ([league, points]) => ({
+            type: 'scattergl', mode: 'markers', name: league, x: points.x, y: points.y,
+            customdata: points.customdata, hovertemplate: lod.hovertemplate, showlegend: true,
+            marker: {color: lod.colors[league] || '#888888', size: 10, opacity: 0.8,
+                     line: {width: 1, color: 'white'}}
+        }));
+    }
+
+    function update() {
+        const visible = visibleTiles();
+        const wanted = visible.total <= lod.maxPoints ? visible.keys.join(',') : '';
+        if (wanted === drawn) return;
+        drawn = wanted;
+        const keys = wanted ? visible.keys : [];
+        Promise.all(keys.map(loadTile)).then(() => {
+            if (drawn !== wanted) return;
+            // The count heatmap stays as the first trace, faded while players are shown
+            const overview = Object.assign({}, plot.data[0], {opacity: keys.length ? 0.35 : 1});
+            Plotly.react(plot, [overview].concat(pointTraces(keys)), plot.layout);
+        });
+    }
+
+    plot.on('plotly_relayout', () => {
+        clearTimeout(timer);
+        timer = setTimeout(update, 150);
+    });
+})();
+"""
+
+# Changes to the rendering code, or to the shared page helpers (whose hashed
+# file name every page links to), invalidate every recorded hash
+_code_digest = hashlib.sha256()
+for _path in (__file__, page_assets.__file__):
+    with open(_path, 'rb') as _source:
+        _code_digest.update(_source.read())
+CODE_HASH = _code_digest.hexdigest()
+
+
+def make_specs(stat_pairs=DEFAULT_STAT_PAIRS, leagues=(None,), positions=(None,),
+               min_minutes=DEFAULT_MIN_MINUTES, min_goals=0):
+    """ Every combination of the given options as spec dicts (None means all leagues / positions) """
+    return [{'x': x, 'y': y, 'league': league, 'position': position, 'min_minutes': minutes, 'min_goals': min_goals}
+            for (x, y), league, position, minutes in itertools.product(stat_pairs, leagues, positions, min_minutes)]
+
+
+def spec_filename(spec):
+    """ Output file name of a spec, e.g. gls-vs-xg_la-liga_attack_500min.html """
+    parts = [slugify(f"{spec['x']} vs {spec['y']}"), slugify(spec['league'] or 'all leagues'),
+             slugify(spec['position'] or 'all positions'), f"{spec['min_minutes']}min"]
+    if spec.get('min_goals'):
+        parts.append(f"{spec['min_goals']}gls")
+    return '_'.join(parts) + '.html'
+
+
+def load_groups(api, specs):
+    """ Rows every spec could need, split into {(league, position group): DataFrame} in one groupby pass """
+    df = api.get_data(min_goals=min(spec.get('min_goals', 0) for spec in specs),
+                      min_minutes=min(spec['min_minutes'] for spec in specs))
+    df = pd.concat([df, df['Comp'].astype(str).map(LEAGUE_NAMES).rename('League'),
+                    position_groups(df['Pos']).rename('Position')], axis=1)
+    return {key: group for key, group in df.groupby(['League', 'Position'], observed=True)}
+
+
+def spec_data(groups, spec):
+    """ Rows of one spec, taken from the pre-split groups """
+    parts = [group for (league, position), group in groups.items()
+             if spec['league'] in (None, league) and spec['position'] in (None, position)]
+    if not parts:
+        return None
+    df = pd.concat(parts).sort_index()
+    keep = (df['Min'] >= spec['min_minutes']) & (df['Gls'] >= spec.get('min_goals', 0))
+    columns = ['Player', 'Squad', 'Age', 'Gls', 'Ast', 'League', 'Position', spec['x'], spec['y']]
+    return df.loc[keep, list(dict.fromkeys(columns))]
+
+
+def spec_hash(spec, df, plotly_js='cdn'):
+    """ Hash of everything a rendered figure depends on """
+    digest = hashlib.sha256(CODE_HASH.encode())
+    digest.update(plotly_js.encode())
+    digest.update(json.dumps(spec, sort_keys=True).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(','.join(df.columns).encode())
+    return digest.hexdigest()
+
+
+def stat_label(column):
+    """ Axis title such as 'Goals (Gls)' """
+    return f'{STAT_LABELS[column]} ({column})' if column in STAT_LABELS else column
+
+
+def point_hovertemplate(x, y):
+    """ Hover text of one player marker (customdata is Player, Squad, Age, Ast) """
+    extra_hover = '' if 'Ast' in (x, y) else 'Assists: %{customdata[3]}<br>'
+    return (
+        '<b>%{customdata[0]}</b><br>' +
+        'Team: %{customdata[1]}<br>' +
+        'Age: %{customdata[2]}<br>' +
+        f'{HOVER_NAMES.get(x, x)}: %{{x}}<br>' +
+        f'{HOVER_NAMES.get(y, y)}: %{{y:.2f}}<br>' +
+        extra_hover +
+        '<extra></extra>'
+    )
+
+
+def _axis_values(df, column):
+    return df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def grid_edges(df, x, y, n):
+    """ Edges of n equal bins spanning the finite values of x and of y """
+    edges = []
+    for column in (x, y):
+        values = _axis_values(df, column)
+        values = values[np.isfinite(values)]
+        lo, hi = (values.min(), values.max()) if len(values) else (0.0, 1.0)
+        if hi <= lo:
+            lo, hi = lo - 0.5, hi + 0.5
+        edges.append(np.linspace(lo, hi, n + 1))
+    return edges
+
+
+def grid_cells(df, x, y, edges):
+    """ (x bin, y bin) of every row of df; -1 where a value is missing """
+    cells = []
+    for column, axis_edges in zip((x, y), edges):
+        values = _axis_values(df, column)
+        cell = np.clip(np.searchsorted(axis_edges, values, side='right') - 1, 0, len(axis_edges) - 2)
+        cells.append(np.where(np.isfinite(values), cell, -1))
+    return cells
+
+
+def bin_counts(df, x, y, n=BIN_GRID):
+    """ (x edges, y edges, counts[x bin, y bin]) of the players of df on an n x n grid """
+    edges = grid_edges(df, x, y, n)
+    i, j = grid_cells(df, x, y, edges)
+    valid = (i >= 0) & (j >= 0)
+    counts = np.bincount(i[valid] * n + j[valid], minlength=n * n).reshape(n, n)
+    return edges[0], edges[1], counts
+
+
+def bin_trace(df, x, y):
+    """ Heatmap of player counts per 2D bin (empty bins transparent) """
+    x_edges, y_edges, counts = bin_counts(df, x, y)
+    z = counts.T.astype(np.float64)
+    z[z == 0] = np.nan
+    return go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=z,
+        colorscale='Blues',
+        zmin=1,
+        colorbar=dict(title='Players'),
+        hovertemplate=(f'{HOVER_NAMES.get(x, x)}: %{{x:.2f}}<br>' +
+                       f'{HOVER_NAMES.get(y, y)}: %{{y:.2f}}<br>' +
+                       '%{z} players<br>Zoom in to see them<extra></extra>'),
+        name='Players',
+        showscale=True
+    )
+
+
+def detail_tiles(df, x, y):
+    """ Players of a binned plot split into TILE_GRID x TILE_GRID tiles for drill-down (None below BIN_THRESHOLD) """
+    if len(df) <= BIN_THRESHOLD:
+        return None
+    edges = grid_edges(df, x, y, TILE_GRID)
+    i, j = grid_cells(df, x, y, edges)
+    columns = list(dict.fromkeys([x, y, 'Player', 'Squad', 'Age', 'Ast', 'League']))
+    points = df[columns].assign(_tile=np.char.add(np.char.add(i.astype(str), '_'), j.astype(str)))
+    points = points[(i >= 0) & (j >= 0)]
+    tables = {key: encode_table(tile.drop(columns='_tile'), dict_columns=('Squad', 'League'), text_columns=('Player',))
+              for key, tile in points.groupby('_tile', sort=True)}
+    return {'x': x, 'y': y, 'xEdges': edges[0].tolist(), 'yEdges': edges[1].tolist(),
+            'counts': {key: table['length'] for key, table in tables.items()}, 'tables': tables,
+            'colors': LEAGUE_COLORS, 'hovertemplate': point_hovertemplate(x, y), 'maxPoints': DRILL_POINTS}
+
+
+def build_figure(df, x='Gls', y='xG', title=None, subtitle=None):
+    """ Scatter of y against x with one trace per league
+
+    Above WEBGL_THRESHOLD points the markers use WebGL; above BIN_THRESHOLD
+    the figure holds binned counts instead (pass detail_tiles to write_page
+    so the page can show the players on zoom).
+    """
+    fig = go.Figure()
+    if len(df) > BIN_THRESHOLD:
+        fig.add_trace(bin_trace(df, x, y))
+    else:
+        marker_trace = go.Scattergl if len(df) > WEBGL_THRESHOLD else go.Scatter
+
+        # Add traces for each league
+        for league, league_data in df.groupby('League', sort=False, observed=True):
+            fig.add_trace(marker_trace(
+                x=league_data[x],
+                y=league_data[y],
+                mode='markers',
+                name=league,
+                marker=dict(
+                    color=LEAGUE_COLORS.get(league, '#888888'),
+                    size=10,
+                    line=dict(width=1, color='white'),
+                    opacity=0.8
+                ),
+                hovertemplate=point_hovertemplate(x, y),
+                customdata=league_data[['Player', 'Squad', 'Age', 'Ast']].values,
+                showlegend=True
+            ))
+
+    # Add reference line (y = x) for stats in the same unit
+    if (x, y) in DIAGONAL_PAIRS and len(df):
+        lo, hi = df[x].min(), df[x].max()
+        fig.add_shape(
+            type="line", x0=lo, y0=lo, x1=hi, y1=hi,
+            line=dict(color="rgba(0,0,0,0.2)", width=2, dash="dash"),
+        )
+
+    title = title or f"⚽ {STAT_LABELS.get(x, x)} vs {STAT_LABELS.get(y, y)}"
+    fig.update_layout(
+        title={
+            'text': title + (f"<br><sub>{subtitle}</sub>" if subtitle else ''),
+            'x': 0.5,
+            'xanchor': 'center'
+        },
+        xaxis=dict(
+            title=stat_label(x),
+            showgrid=True,
+            gridcolor='rgba(0,0,0,0.05)',
+            automargin=True
+        ),
+        yaxis=dict(
+            title=dict(
+                text=stat_label(y),
+                standoff=20
+            ),
+            showgrid=True,
+            gridcolor='rgba(0,0,0,0.05)',
+            automargin=True
+        ),
+        plot_bgcolor="#f9f9f9",
+        paper_bgcolor="#f0f2f5",
+        font=dict(family="Segoe UI, sans-serif", size=14),
+        margin=dict(l=80, r=40, t=120, b=80),
+        hovermode='closest',
+        showlegend=True,
+        legend=dict(
+            title="League",
+            orientation="h",
+            x=0.5,
+            xanchor='center',
+            y=-0.15,
+            font=dict(size=12)
+        ),
+        height=1000
+    )
+    return fig
+
+
+def page_html(fig, plotly_src=None, data_src=None, script_srcs=()):
+    """ Standalone page around a figure
+
+    Given plotly_src and data_src the page loads plotly.js and the figure
+    (window.scatterFigure) from those scripts, then script_srcs; otherwise
+    the figure is inlined and plotly.js comes from the CDN.
+    """
+    if data_src is None:
+        plotly_html = fig.to_html(
+            include_plotlyjs="cdn",
+            full_html=False,
+            config=PLOT_CONFIG
+        )
+    else:
+        plotly_html = f"""<div id="scatter-plot" style="height:100%; width:100%;"></div>
+        <script src="{plotly_src}"></script>
+        <script src="{data_src}"></script>
+        <script>
+            Plotly.newPlot('scatter-plot', scatterFigure.data, scatterFigure.layout, {json.dumps(PLOT_CONFIG)});
+        </script>""" + ''.join(f"""
+        <script src="{src}"></script>""" for src in script_srcs)
+    return f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        body {{
+            margin: 0;
+            padding: 20px;
+            font-family: 'Segoe UI', sans-serif;
+            background: #f0f2f5;
+        }}
+        .plot-container {{
+            width: 100%;
+            min-width: 1200px;  /* ensures y-axis label fits */
+            margin: 0 auto;
+            height: 1000px;
+            overflow: visible;
+        }}
+    </style>
+</head>
+<body>
+    <div class="plot-container">
+        {plotly_html}
+    </div>
+</body>
+</html>
+"""
+
+
+def write_page(fig, output_file, plotly_js='local', data_dir=None, tiles=None):
+    """ Write the page for fig to output_file
+
+    plotly_js is 'cdn' (figure inlined, library from the CDN), 'local' (one
+    content-hashed plotly.js under assets/ next to the page) or the path of a
+    bundle already written by plotly_bundle. With a local library the figure
+    goes to a content-hashed script in data_dir (default <page>_data/).
+    tiles (see detail_tiles) are written there too, as one shard per tile
+    for the drill-down script; the figure is then never inlined.
+    """
+    if plotly_js == 'cdn' and tiles is None:
+        html = page_html(fig)
+    else:
+        page_dir = os.path.dirname(output_file)
+        asset_dir = os.path.join(page_dir, ASSET_DIRNAME)
+        if plotly_js == 'cdn':
+            plotly_src = PLOTLY_CDN
+        else:
+            bundle = plotly_bundle(asset_dir) if plotly_js == 'local' else plotly_js
+            plotly_src = page_src(bundle, output_file)
+        stem = os.path.splitext(os.path.basename(output_file))[0]
+        data_dir = data_dir or os.path.join(page_dir, stem + '_data')
+        data = write_hashed(data_dir, stem, '.js', f'window.scatterFigure = {fig.to_json()};\n')
+        scripts = [] if tiles is None else [write_page_helpers(asset_dir), write_tiles(tiles, data_dir, stem, output_file),
+                                            write_hashed(asset_dir, 'scatter-lod', '.js', JS_SCATTER_LOD)]
+        html = page_html(fig, plotly_src, page_src(data, output_file),
+                         [page_src(script, output_file) for script in scripts])
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+    return output_file
+
+
+def write_tiles(tiles, data_dir, stem, page_file):
+    """ One shard script per tile plus the tile index (window.scatterTiles) for page_file; returns the index script """
+    meta = {key: value for key, value in tiles.items() if key != 'tables'}
+    meta['shards'] = {}
+    for key, table in tiles['tables'].items():
+        shard = write_shard(data_dir, f'{stem}-tile-{key}', 'onScatterTile', key, table)
+        meta['shards'][key] = page_src(shard, page_file)
+    return write_data_script(data_dir, f'{stem}-tiles', 'scatterTiles', meta)
+
+
+def spec_subtitle(spec):
+    """ Filter summary shown under the title """
+    parts = [spec['league'] or 'All leagues', (spec['position'] or 'all positions').lower(),
+             f"≥{spec['min_minutes']} min"]
+    if spec.get('min_goals'):
+        parts.append(f"≥{spec['min_goals']} goals")
+    return ' · '.join(parts)
+
+
+def render_spec(spec, df, path, plotly_js='cdn'):
+    """ Render one spec to path (runs in a worker process); figure data goes to data/ beside it """
+    fig = build_figure(df, spec['x'], spec['y'], subtitle=spec_subtitle(spec))
+    return write_page(fig, path, plotly_js, data_dir=os.path.join(os.path.dirname(path), 'data'),
+                      tiles=detail_tiles(df, spec['x'], spec['y']))
+
+
+def render_batch(api, specs, out_dir, workers=None, force=False, plotly_js='local'):
+    """ Render every spec into out_dir, skipping those whose inputs are unchanged
+
+    With plotly_js='local' every page shares one plotly.js in out_dir/assets/.
+    Returns {'rendered': [...], 'skipped': [...], 'empty': [...]} lists of file names.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    if plotly_js == 'local':
+        plotly_js = plotly_bundle(os.path.join(out_dir, ASSET_DIRNAME))
+    groups = load_groups(api, specs)
+    report = {'rendered': [], 'skipped': [], 'empty': []}
+    jobs = []
+    for spec in specs:
+        name = spec_filename(spec)
+        df = spec_data(groups, spec)
+        if df is None or df.empty:
+            report['empty'].append(name)
+            continue
+        digest = spec_hash(spec, df, plotly_js)
+        if not force and manifest.get(name) == digest and os.path.exists(os.path.join(out_dir, name)):
+            report['skipped'].append(name)
+            continue
+        manifest[name] = digest
+        jobs.append((spec, df, os.path.join(out_dir, name), plotly_js))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(render_spec, *job) for job in jobs]
+            report['rendered'] = [os.path.basename(future.result()) for future in futures]
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render scatter plot variants in parallel')
+    parser.add_argument('filename', nargs='?', default='players_data-2024_2025.csv')
+    parser.add_argument('--out', default='scatter_plots')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help='re-render specs even if unchanged')
+    parser.add_argument('--plotly-js', choices=['local', 'cdn'], default='local',
+                        help='share one local plotly.js bundle (default) or link the CDN')
+    args = parser.parse_args()
+
+    stats = sorted({stat for pair in DEFAULT_STAT_PAIRS for stat in pair})
+    api = SOCCERAPI(args.filename, columns=required_columns(stats=stats + ['Age'], filters=[]), compact=True)
+    specs = make_specs(leagues=[None] + list(LEAGUE_COLORS), positions=[None, 'ATTACK', 'DEFENSE', 'GOALKEEPER'])
+    report = render_batch(api, specs, args.out, args.workers, args.force, args.plotly_js)
+    print(f"✅ {len(specs)} specs: {len(report['rendered'])} rendered, {len(report['skipped'])} unchanged, "
+          f"{len(report['empty'])} without players")
+    print(f"   Output: {args.out}/")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,61 +5,591 @@ soccer_api.py
 
 API for interacting with the soccer dataset. Used in dashboard.py
 """
+import contextlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
+from soccer_cache import LRUCache
+from soccer_delta import DELTA_KEYS, append_rows, assign_rows, changed_cells, match_rows, read_delta
+from soccer_derived import METRICS, DerivedColumns, Metric, base_columns
+from soccer_index import FilterIndex
+from soccer_normalize import STAT_GROUPS, StatNormalizer
+from soccer_profile import Profiler
+from soccer_query import Query
+from soccer_rollup import PlayerRollup, player_keys
+from soccer_schema import write_light
+from soccer_seasons import SeasonCatalog, filter_mask
+from soccer_shm import SharedDataset, SharedTables
+from soccer_similarity import SimilarityIndex
+from soccer_snapshot import Snapshot
+from soccer_store import read_csv, read_csv_cached
+
+# Columns every player row needs, and the columns get_data filters on
+ID_COLUMNS = ['Player', 'Born', 'Pos', 'Squad', 'Comp']
+FILTER_COLUMNS = {'min_goals': 'Gls', 'min_assists': 'Ast', 'comp': 'Comp', 'squad': 'Squad',
+                  'age_range': 'Age', 'min_minutes': 'Min'}
+
+
+def _key_values(values):
+    """ Normalize a comp/squad argument for cache keys (lists are order-insensitive) """
+    return frozenset(values) if isinstance(values, list) else values
+
+
+def required_columns(stats=(), filters=None):
+    """ Columns needed to run get_data with the given filters and read the given stats
+
+    filters names the get_data keyword arguments the caller uses; by default
+    every filter column is included. Derived metrics in stats (see
+    soccer_derived) are replaced by the columns they are computed from.
+    """
+    stats = base_columns(stats)
+    filters = FILTER_COLUMNS if filters is None else filters
+    # get_data always applies the goals, assists and minutes thresholds
+    filters = set(filters) | {'min_goals', 'min_assists', 'min_minutes'}
+    columns = ID_COLUMNS + [FILTER_COLUMNS[name] for name in FILTER_COLUMNS if name in filters] + list(stats)
+    return list(dict.fromkeys(columns))
+
+
+def _snapshot_attribute(name):
+    """ Read-only attribute of the current snapshot """
+    return property(lambda self: getattr(self.snapshot, name), doc=f"{name} of the current snapshot")
+
+
 class SOCCERAPI():
-    def __init__(self, filename=None):
-        """ Initialize and optionally load data """
-        self.data = None
+    data = _snapshot_attribute('data')
+    index = _snapshot_attribute('index')
+    players = _snapshot_attribute('players')
+    rollup = _snapshot_attribute('rollup')
+    rollup_index = _snapshot_attribute('rollup_index')
+    cube = _snapshot_attribute('cube')
+    seasons = _snapshot_attribute('seasons')
+    normalizers = _snapshot_attribute('normalizers')
+    similarity = _snapshot_attribute('similarity')
+    # Bumped by every load and delta so consumers can tell their copies are stale
+    version = _snapshot_attribute('version')
+
+    def __init__(self, filename=None, cache=True, columns=None, compact=False, dedupe=False,
+                 result_cache_entries=256, result_cache_bytes=64 * 1024 * 1024, profile=None):
+        """ Initialize and optionally load data
+
+        result_cache_entries / result_cache_bytes bound the LRU cache of query
+        results (see cache_stats). profile=True (or a Profiler, or the
+        SOCCER_PROFILE environment variable) turns on instrumentation; see
+        enable_profiling.
+
+        The loaded state lives in self.snapshot (see soccer_snapshot), which
+        loads, reloads and deltas replace atomically. Every query reads it once,
+        so queries from many threads need no locking; writers are serialized.
+        """
+        self.snapshot = Snapshot()
+        self.lock = threading.RLock()
+        self.loader = None
+        self.shared = None
+        self.results = LRUCache(result_cache_entries, result_cache_bytes)
+        self.metrics = dict(METRICS)
+        self.profiler = None
+        if profile is None:
+            profile = bool(os.environ.get('SOCCER_PROFILE'))
+        if profile:
+            self.enable_profiling(profile if isinstance(profile, Profiler) else None)
         if filename:
-            self.load_data(filename)
-
-    def load_data(self, filename):
-        """ Load and store the data """
-        self.data = pd.read_csv(filename)
-        return self.data
-
-    def get_data(self, min_goals=10, min_assists=0, comp=None, squad=None, age_range=None, min_minutes=0):
-        """ Return player data filtered by goals, assists, league, squad, age, and minutes played"""
-        # Apply Goals Filter
-        filtered = self.data[self.data["Gls"] >= min_goals]
-        # Apply Assists filter
-        filtered = filtered[filtered["Ast"] >= min_assists]
-        # Apply competition filter if provided
+            self.load_data(filename, cache=cache, columns=columns, compact=compact, dedupe=dedupe)
+
+    def load_data(self, filename, cache=True, columns=None, compact=False, dedupe=False):
+        """ Load and store the data, reading through the columnar cache unless cache=False
+
+        columns restricts the load to a subset of columns (see required_columns)
+        and compact=True narrows dtypes: categories for Comp/Squad/Pos/Nation,
+        the smallest int that fits for counts and float32 for other numbers.
+        dedupe=True loads the narrow "light" table instead, regenerating it
+        (see soccer_schema.write_light) if the full CSV has changed. The
+        per-player season rollup (see soccer_rollup) and the aggregate cube
+        behind summarize (see soccer_cube) are built here too. Queries running
+        meanwhile keep using the previous version.
+        """
+        source = (filename, {'cache': cache, 'columns': columns, 'compact': compact, 'dedupe': dedupe})
+        if dedupe:
+            filename = write_light(filename)
+        if cache:
+            data = read_csv_cached(filename, columns, compact)
+        else:
+            data = read_csv(filename, columns, compact)
+        return self._publish(Snapshot(data=data, source=source)).data
+
+    def reload(self, background=True):
+        """ Load the last loaded file again as a new version, on a background thread by default
+
+        Queries are answered from the current version until the new one is
+        built, which then replaces it atomically. Returns a Future of the new
+        version number (the number itself with background=False).
+        """
+        if self.snapshot.source is None:
+            raise ValueError("reload needs data loaded with load_data")
+        filename, options = self.snapshot.source
+
+        def load():
+            self.load_data(filename, **options)
+            return self.version
+
+        if not background:
+            return load()
+        if self.loader is None:
+            self.loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='soccer-reload')
+        return self.loader.submit(load)
+
+    def load_seasons(self, files, columns=None, chunksize=20000, cache=True):
+        """ Query many season files by streaming them instead of loading one table
+
+        files is a glob pattern such as 'players_data-*.csv' or a list of
+        paths. get_data, get_unique_values, get_column_range,
+        get_squads_by_competition and aggregate then run chunk by chunk over
+        the union of seasons (rows gain a Season column), and their season=
+        argument skips the other files. Player lookups, normalize and
+        summarize need load_data.
+        """
+        return self._publish(Snapshot(seasons=SeasonCatalog(files, columns, chunksize, cache))).seasons
+
+    def _publish(self, snapshot, keep=None):
+        """ Make snapshot the current version with one reference swap
+
+        Cached results of the replaced version whose key (without the
+        version) passes keep carry over to the new one; the rest are dropped.
+        """
+        with self.lock:
+            previous = self.snapshot
+            snapshot.version = previous.version + 1
+            self.snapshot = snapshot
+
+            def carry(key):
+                if key[0] == snapshot.version:
+                    return key
+                if key[0] == previous.version and keep is not None and keep(key[1:]):
+                    return (snapshot.version,) + key[1:]
+                return None
+
+            self.results.rekey(carry)
+        return snapshot
+
+    def apply_delta(self, delta):
+        """ Apply a delta of changed player rows (CSV path or DataFrame) keyed by Player + Squad
+
+        Rows matching a loaded Player + Squad overwrite the columns the delta
+        carries (empty cells keep the current value); other rows are appended.
+        Only the cells that change are written, and the filter indexes, player
+        rollup, aggregate cube and cached results are updated for just those
+        rows and columns, in a new version derived from the current one.
+        Returns {'version', 'updated', 'inserted', 'columns'}.
+        """
+        with self.lock:
+            current = self.snapshot
+            if current.data is None or current.players is None:
+                raise ValueError("apply_delta needs data with Player and Squad loaded with load_data")
+            if current.shared is not None:
+                raise ValueError("apply_delta needs a private table; this one is attached read-only from shared memory")
+            delta = read_delta(delta, current.data.columns)
+            rows, updates, inserts = match_rows(current.data, current.players, delta)
+            values = delta.iloc[updates].drop(columns=DELTA_KEYS)
+            changed, columns, values = changed_cells(current.data, rows, values)
+            rows, values = rows[changed], values.iloc[changed]
+            if not len(rows) and not len(inserts):
+                return {'version': current.version, 'updated': 0, 'inserted': 0, 'columns': []}
+
+            old = current.data
+            data = assign_rows(old, rows, values) if len(rows) else old
+            new_rows = np.arange(len(old), len(old) + len(inserts))
+            if len(new_rows):
+                data = append_rows(data, delta.iloc[inserts])
+            snapshot = current.derive()
+            snapshot.data = data
+            snapshot.index.update(data, rows, columns)
+            snapshot.index.update(data, new_rows)
+            snapshot.players.add(data, new_rows)
+            # New rows or changed player keys regroup the stints, so the rollup is rebuilt
+            rebuild = bool(len(new_rows)) or bool(set(player_keys(data)) & set(columns))
+            player_columns = columns
+            if rebuild:
+                snapshot.rollup = PlayerRollup(data)
+                snapshot.rollup_index = FilterIndex(snapshot.rollup.table)
+            elif len(rows):
+                # A Min change can move a player's primary club, and count changes recompute ratios
+                players, player_columns = snapshot.rollup.refresh(data, rows, columns)
+                snapshot.rollup_index.update(snapshot.rollup.table, players, player_columns)
+            snapshot.cube.update(removed=old.iloc[rows], added=data.iloc[np.r_[rows, new_rows]])
+            keep = self._carry_over(snapshot, columns, resized=rebuild, player_columns=player_columns)
+            self._publish(snapshot, keep)
+        return {'version': snapshot.version, 'updated': len(rows), 'inserted': len(new_rows), 'columns': columns}
+
+    @staticmethod
+    def _carry_over(snapshot, columns, resized, player_columns=None):
+        """ Drop the derived state of snapshot that reads a changed column; returns keep() for cached results
+
+        player_columns are the rollup columns that changed (columns by default).
+        """
+        changed = {'stint': set(columns), 'player': set(columns if player_columns is None else player_columns)}
+        if resized:
+            changed = {level: set(snapshot.level(level)[0].columns) for level in changed}
+        columns = changed['stint'] | changed['player']
+
+        def keep(key):
+            if key[0] in ('get_unique_values', 'get_column_range'):
+                return key[1] not in columns
+            if key[0] == 'get_squads_by_competition':
+                return not columns & {'Comp', 'Squad'}
+            return not columns
+
+        for level, normalizer in snapshot.normalizers.items():
+            normalizer.invalidate(snapshot.level(level)[0], changed[level])
+        snapshot.similarity = {key: engine for key, engine in snapshot.similarity.items()
+                               if not resized and not changed[key[0]] & (set(key[1]) | {'Min'})}
+        for level, derived in snapshot.derived.items():
+            derived.invalidate(snapshot.level(level)[0], changed[level])
+        return keep
+
+    def share(self, name=None):
+        """ Publish the loaded table and player rollup in shared memory for other processes
+
+        Returns a SharedDataset (see soccer_shm); workers pass its name to
+        SOCCERAPI.attach. The segments stay until its unlink() (or the end
+        of a with block on it, or of this process).
+        """
+        snapshot = self.snapshot
+        if snapshot.data is None:
+            raise ValueError("share needs data loaded with load_data")
+        return SharedDataset(snapshot.data, snapshot.rollup, name)
+
+    @classmethod
+    def attach(cls, name, **kwargs):
+        """ Read-only SOCCERAPI over a dataset another process published with share()
+
+        The table columns are views of the shared segment, not copies; the
+        filter indexes and aggregate cube are built locally. kwargs are
+        passed to SOCCERAPI (result cache sizes, profile). Call close() when done.
+        """
+        api = cls(**kwargs)
+        tables = SharedTables(name)
+        rollup = None
+        if tables.player is not None:
+            rollup = PlayerRollup.from_parts(tables.player, **tables.rollup_arrays)
+        api.shared = tables
+        api._publish(Snapshot(data=tables.data, rollup=rollup, shared=tables))
+        return api
+
+    def close(self):
+        """ Drop the loaded data and detach from shared memory (see attach) """
+        self._publish(Snapshot())
+        self.results.clear()
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
+
+    def enable_profiling(self, profiler=None):
+        """ Record timings, rows, bytes and get_data filter stages for every query (see soccer_profile)
+
+        Profiling wraps this instance's methods; while it is off they are not
+        wrapped at all, so it costs nothing.
+        """
+        if self.profiler is not None:
+            Profiler.detach(self)
+        return (profiler or Profiler()).attach(self).profiler
+
+    def disable_profiling(self):
+        """ Remove the instrumentation added by enable_profiling """
+        if self.profiler is not None:
+            Profiler.detach(self)
+
+    def span(self, name):
+        """ Context manager timing a caller-defined stage (e.g. 'render') when profiling is on """
+        return self.profiler.span(name) if self.profiler is not None else contextlib.nullcontext()
+
+    def cache_stats(self):
+        """ Hit/miss counters and size of the query result cache """
+        return self.results.stats()
+
+    def get_data(self, min_goals=10, min_assists=0, comp=None, squad=None, age_range=None, min_minutes=0,
+                 season=None, level='stint'):
+        """ Return player data filtered by goals, assists, league, squad, age, and minutes played
+
+        level='stint' returns one row per club a player appeared for;
+        level='player' filters and returns the season-total rows of the
+        rollup, where comp/squad match the player's main club.
+        """
+        snapshot = self.snapshot
+        key = (snapshot.version, 'get_data', min_goals, min_assists, _key_values(comp), _key_values(squad),
+               None if age_range is None else tuple(age_range), min_minutes, _key_values(season), level)
+        result = self.results.get_or_compute(key, lambda: self._filter_data(
+            snapshot, min_goals, min_assists, comp, squad, age_range, min_minutes, season, level))
+        # Shallow copy so callers adding columns do not modify the cached frame
+        return result.copy(deep=False)
+
+    def query(self, level='stint'):
+        """ Start a lazy query: query().where('Gls', '>=', 5).select(...).order_by('G+A').limit(10).execute()
+
+        Unlike get_data, any loaded column can be filtered on (see
+        soccer_query for the operators); nothing runs until execute().
+        """
+        if self.seasons is not None:
+            raise ValueError("query() works on data loaded with load_data")
+        self.snapshot.level(level)
+        return Query(self, level)
+
+    @staticmethod
+    def _check_season(snapshot, season):
+        if season is not None and snapshot.seasons is None:
+            raise ValueError("season filters need data loaded with load_seasons")
+
+    def _filter_data(self, snapshot, min_goals, min_assists, comp, squad, age_range, min_minutes, season=None,
+                     level='stint'):
+        self._check_season(snapshot, season)
+        if snapshot.seasons is not None and level == 'stint':
+            return snapshot.seasons.get_data(season, min_goals=min_goals, min_assists=min_assists, comp=comp,
+                                             squad=squad, age_range=age_range, min_minutes=min_minutes)
+        data, index = snapshot.level(level)
+        stages = [] if self.profiler is not None else None
+        mask = self._filter_mask(index, min_goals, min_assists, comp, squad, age_range, min_minutes, stages)
+        if stages is not None:
+            self.profiler.note_stages(stages)
+        # copy() consolidates the one-block-per-column layout of the memory-mapped cache
+        return data[mask].copy()
+
+    @staticmethod
+    def _filter_mask(index, min_goals=10, min_assists=0, comp=None, squad=None, age_range=None, min_minutes=0,
+                     stages=None):
+        """ Boolean row mask for the get_data filters, combined as row bitmaps
+
+        If stages is a list, (stage, rows in, rows out) is appended for each
+        filter in the order they are applied.
+        """
+        predicates = [("Gls", index.between("Gls", lo=min_goals)), ("Ast", index.between("Ast", lo=min_assists))]
         if comp is not None:
-            if isinstance(comp, list):
-                filtered = filtered[filtered["Comp"].isin(comp)]
-            else:
-                filtered = filtered[filtered["Comp"] == comp]
-        # Apply squad filter if provided
+            predicates.append(("Comp", index.isin("Comp", comp if isinstance(comp, list) else [comp])))
         if squad is not None:
-            if isinstance(squad, list):
-                filtered = filtered[filtered["Squad"].isin(squad)]
-            else:
-                filtered = filtered[filtered["Squad"] == squad]
-        # Apply age filter if provided
+            predicates.append(("Squad", index.isin("Squad", squad if isinstance(squad, list) else [squad])))
         if age_range is not None:
-            filtered = filtered[(filtered['Age'] >= age_range[0]) & (filtered['Age'] <= age_range[1])]
-        # Apply minutes filter
-        filtered = filtered[filtered["Min"] >= min_minutes]
-        return filtered
+            predicates.append(("Age", index.between("Age", lo=age_range[0], hi=age_range[1])))
+        predicates.append(("Min", index.between("Min", lo=min_minutes)))
+        bits = predicates[0][1]
+        for _, predicate in predicates[1:]:
+            bits = bits & predicate
+        if stages is not None:
+            running, rows = index.all_rows(), index.n_rows
+            for name, predicate in predicates:
+                running = running & predicate
+                count = int(np.unpackbits(running, count=index.n_rows).sum())
+                stages.append((name, rows, count))
+                rows = count
+        return index.to_mask(bits)
 
-    def get_unique_values(self, column):
+    def get_unique_values(self, column, season=None):
         """ Get sorted unique values for a column """
-        return sorted(list(self.data[column].unique()))
+        snapshot = self.snapshot
+        key = (snapshot.version, 'get_unique_values', column, _key_values(season))
+        return list(self.results.get_or_compute(key, lambda: self._unique_values(snapshot, column, season)))
 
-    def get_column_range(self, column):
+    def _unique_values(self, snapshot, column, season=None):
+        self._check_season(snapshot, season)
+        if snapshot.seasons is not None:
+            return snapshot.seasons.unique_values(column, season)
+        if column in snapshot.index.bitmaps:
+            return sorted(snapshot.index.values(column))
+        return sorted(list(snapshot.data[column].unique()))
+
+    def get_column_range(self, column, season=None):
         """ Get min/max range for a column """
-        return int(self.data[column].min()), int(self.data[column].max())
+        snapshot = self.snapshot
+        key = (snapshot.version, 'get_column_range', column, _key_values(season))
+        return self.results.get_or_compute(key, lambda: self._column_range(snapshot, column, season))
+
+    def _column_range(self, snapshot, column, season=None):
+        self._check_season(snapshot, season)
+        if snapshot.seasons is not None:
+            return snapshot.seasons.column_range(column, season)
+        if column in snapshot.index.sorted:
+            values = snapshot.index.sorted[column][0]
+            return int(values[0]), int(values[-1])
+        return int(snapshot.data[column].min()), int(snapshot.data[column].max())
 
-    def get_squads_by_competition(self, comp_values):
+    def get_squads_by_competition(self, comp_values, season=None):
         """ Get available squads filtered by selected competitions """
-        filtered_data = self.data if not comp_values else self.data[self.data['Comp'].isin(comp_values)]
-        return sorted(list(filtered_data['Squad'].unique()))
+        snapshot = self.snapshot
+        key = (snapshot.version, 'get_squads_by_competition', frozenset(comp_values or ()), _key_values(season))
+        return list(self.results.get_or_compute(
+            key, lambda: self._squads_by_competition(snapshot, comp_values, season)))
+
+    def _squads_by_competition(self, snapshot, comp_values, season=None):
+        self._check_season(snapshot, season)
+        if snapshot.seasons is not None:
+            return snapshot.seasons.squads_by_competition(comp_values, season)
+        index = snapshot.index
+        if not comp_values:
+            return sorted(index.values('Squad'))
+        comp_bits = index.isin('Comp', comp_values)
+        # A squad is available if its rows overlap the selected competitions
+        return sorted(squad for squad, bits in index.bitmaps['Squad'].items() if (bits & comp_bits).any())
+
+    def aggregate(self, by, stats, season=None, **filters):
+        """ Per-group sums of stats plus a row count over the rows passing the get_data filters
+
+        min_goals defaults to 0 here, so every row is counted unless asked
+        otherwise. With load_seasons the totals are built chunk by chunk.
+        """
+        snapshot = self.snapshot
+        self._check_season(snapshot, season)
+        if snapshot.seasons is not None:
+            return snapshot.seasons.aggregate(by, stats, season, **filters)
+        filters.setdefault('min_goals', 0)
+        data = snapshot.data
+        grouped = data[filter_mask(data, **filters)].groupby(by, observed=True)
+        return grouped[stats].sum().assign(count=grouped.size()).sort_index()
+
+    def summarize(self, by=('Comp',), stats=None, **where):
+        """ League/squad/position/age-band summary from the aggregate cube
+
+        by is any of 'Comp', 'Squad', 'Pos' and 'AgeBand' (() for one total
+        row); where restricts those dimensions, e.g. Comp='es La Liga'.
+        Returns count (rows), sums of count stats and minute-weighted means of
+        rates, indexed by the by columns. Unlike aggregate this never scans
+        the player rows.
+        """
+        snapshot = self.snapshot
+        if snapshot.cube is None:
+            raise ValueError("summarize needs data loaded with load_data")
+        by = (by,) if isinstance(by, str) else tuple(by)
+        stats = None if stats is None else (stats,) if isinstance(stats, str) else tuple(stats)
+        key = (snapshot.version, 'summarize', by, stats,
+               tuple(sorted((dim, _key_values(v)) for dim, v in where.items())))
+        result = self.results.get_or_compute(key, lambda: snapshot.cube.rollup(by, stats, **where))
+        return result.copy(deep=False)
+
+    def normalize(self, df, cols, method='minmax', scope=None, per90=False, level='stint'):
+        """ Scale stat columns of df against the whole loaded dataset
+
+        method is 'minmax', 'zscore', 'percentile' or 'per90'; scope is None,
+        'position' or a column such as 'Comp' to use one reference per group.
+        level picks the reference population (stints or player season totals)
+        and should match the level df came from. Reference distributions are
+        computed once and reused across calls.
+        """
+        snapshot = self.snapshot
+        if level not in snapshot.normalizers:
+            snapshot.normalizers[level] = StatNormalizer(snapshot.level(level)[0])
+        return snapshot.normalizers[level].transform(df, cols, method, scope, per90)
+
+    def get_derived(self, metrics=None, level='stint', df=None):
+        """ Derived metrics (see soccer_derived.METRICS and register_metric) for every row
+
+        metrics defaults to every registered metric. Returns the ID columns
+        plus one column per metric for the whole table at level, or, given df
+        (a get_data result of the same level), a copy of df with the metric
+        columns added. Each metric is computed once per data version in one
+        vectorized pass and kept until a delta changes one of its inputs.
+        """
+        snapshot = self.snapshot
+        data = snapshot.level(level)[0]
+        names = list(self.metrics) if metrics is None else [metrics] if isinstance(metrics, str) else list(metrics)
+        if level not in snapshot.derived:
+            snapshot.derived[level] = DerivedColumns(data, self.metrics)
+        derived = snapshot.derived[level]
+        if df is None:
+            ids = [col for col in ID_COLUMNS if col in data.columns]
+            return pd.concat([data[ids], derived.frame(names)], axis=1)
+        rows = data.index.get_indexer(df.index)
+        if (rows < 0).any():
+            raise ValueError(f"df has rows that are not in the level={level!r} table")
+        return pd.concat([df, derived.frame(names, rows).set_axis(df.index)], axis=1)
+
+    def register_metric(self, name, inputs, compute, description=''):
+        """ Add or replace a derived metric: name = compute(*inputs) over float64 arrays
+
+        inputs are column names or other metric names; compute must be
+        vectorized (e.g. lambda shots, minutes: shots / (minutes / 90)).
+        Cached values of the metric and of the metrics built on it are dropped
+        in a new version; the data and other cached results carry over.
+        """
+        with self.lock:
+            current = self.snapshot
+            if current.data is not None and name in current.data.columns:
+                raise ValueError(f"Derived metric {name!r} would shadow a loaded column")
+            self.metrics = {**self.metrics, name: Metric(name, inputs, compute, description)}
+            snapshot = current.derive()
+            for derived in snapshot.derived.values():
+                derived.invalidate(derived.data, (), self.metrics)
+            self._publish(snapshot, keep=lambda key: True)
+
+    def similar_players(self, player_names, group='ATTACK', k=20, metric='cosine', level='player', **filters):
+        """ The k players most similar to each of player_names over a stat group
+
+        group is a key of STAT_GROUPS ('ATTACK', 'DEFENSE', 'GOALKEEPER') or a
+        list of columns; metric is 'cosine' or 'euclidean'. Count stats are
+        compared per 90 minutes. filters are the get_data keyword arguments
+        and restrict the candidates (min_goals defaults to 0 here). Returns one
+        row per (player, neighbour) with Rank and Similarity or Distance.
+        """
+        cols = STAT_GROUPS[group] if isinstance(group, str) else list(group)
+        cols = [col for col in cols if col != 'Min']
+        snapshot = self.snapshot
+        data, index = snapshot.level(level)
+        missing = [col for col in cols if col not in data.columns]
+        if missing:
+            raise ValueError(f"Columns {missing} are not loaded (see required_columns)")
+        key = (level, tuple(cols))
+        if key not in snapshot.similarity:
+            snapshot.similarity[key] = SimilarityIndex(data, cols)
+        engine = snapshot.similarity[key]
+
+        names = [player_names] if isinstance(player_names, str) else list(player_names)
+        rows = snapshot.players.lookup_many(names)
+        if level == 'player':
+            rows = np.unique(snapshot.rollup.player_of[rows])
+        filters.setdefault('min_goals', 0)
+        mask = self._filter_mask(index, **filters)
+        neighbours, scores = engine.search(rows, k, metric, mask)
+
+        found = neighbours >= 0
+        query = np.repeat(rows, found.sum(axis=1))
+        result = data.iloc[neighbours[found]][[c for c in ID_COLUMNS if c in data.columns]].reset_index(drop=True)
+        result.insert(0, 'Query', data['Player'].to_numpy()[query])
+        result.insert(1, 'Rank', np.nonzero(found)[1] + 1)
+        result['Similarity' if metric == 'cosine' else 'Distance'] = scores[found]
+        return result
+
+    def get_player_rows(self, player_name):
+        """ Get every row (one per club) for a specific player """
+        snapshot = self.snapshot
+        return snapshot.data.iloc[snapshot.players.lookup(player_name)]
 
     def get_player_position(self, player_name):
         """ Get position for a specific player """
-        player_row = self.data[self.data['Player'] == player_name]
-        if not player_row.empty:
-            return player_row['Pos'].values[0]
+        snapshot = self.snapshot
+        rows = snapshot.players.lookup(player_name)
+        if len(rows):
+            return snapshot.data['Pos'].iloc[rows[0]]
         return None
+
+    def get_player_positions(self, player_names):
+        """ Get {player: position} for many players, using each player's first row """
+        snapshot = self.snapshot
+        pos = snapshot.data['Pos']
+        return {name: pos.iloc[snapshot.players.lookup(name)[0]] if name in snapshot.players else None
+                for name in player_names}
+
+    def get_player_squads(self, player_names):
+        """ Get {player: [squads]} for many players, listing every club in table order """
+        snapshot = self.snapshot
+        squad = snapshot.data['Squad'].to_numpy()
+        return {name: list(squad[snapshot.players.lookup(name)]) for name in player_names}
+
+    def get_player_totals(self, player_names):
+        """ Season-total rollup rows (one per player, all clubs combined) for the given players """
+        snapshot = self.snapshot
+        rows = np.unique(snapshot.rollup.player_of[snapshot.players.lookup_many(player_names)])
+        return snapshot.rollup.table.iloc[rows]
+
+    def get_player_stats(self, player_names, columns):
+        """ Get the given stat columns for every row of the given players """
+        snapshot = self.snapshot
+        rows = snapshot.players.lookup_many(player_names)
+        return snapshot.data.iloc[rows][['Player', 'Squad'] + [c for c in columns if c not in ('Player', 'Squad')]]
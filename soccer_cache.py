@@ -0,0 +1,111 @@
+"""
+soccer_cache.py
+
+In-memory LRU cache for SOCCERAPI query results, bounded by entry count and
+by approximate size in bytes, with hit/miss counters for monitoring.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def result_nbytes(value):
+    """ Approximate memory held by a cached result """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """ Least-recently-used cache with entry and byte limits """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        """ Return a cached value and mark it most recently used """
+        with self.lock:
+            return self._get(key, default)
+
+    def _get(self, key, default):
+        if key not in self.entries:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key][0]
+
+    def put(self, key, value):
+        """ Store a value, evicting the least recently used entries to stay within the limits """
+        size = result_nbytes(value)
+        with self.lock:
+            self._put(key, value, size)
+
+    def _put(self, key, value, size):
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key)[1]
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self.entries[key] = (value, size)
+        self.nbytes += size
+        while len(self.entries) > self.max_entries or (self.max_bytes is not None and self.nbytes > self.max_bytes):
+            self.nbytes -= self.entries.popitem(last=False)[1][1]
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """ Return the cached value for key, computing and storing it on a miss """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def rekey(self, rename):
+        """ Replace every key with rename(key), dropping the entries it maps to None; returns how many were dropped
+
+        Recency order is kept; if two keys map to the same new key, the more recently used entry wins.
+        """
+        with self.lock:
+            entries, dropped = OrderedDict(), 0
+            for key, (value, size) in reversed(self.entries.items()):
+                key = rename(key)
+                if key is None or key in entries:
+                    self.nbytes -= size
+                    dropped += 1
+                    continue
+                entries[key] = (value, size)
+            self.entries = OrderedDict(reversed(entries.items()))
+            return dropped
+
+    def clear(self):
+        """ Drop every entry (counters are kept) """
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """ Counters for monitoring """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self.entries), 'bytes': self.nbytes}
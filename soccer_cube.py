@@ -0,0 +1,130 @@
+"""
+soccer_cube.py
+
+Pre-aggregated league/squad/position summaries. AggregateCube groups the
+player table once by Comp x Squad x Pos x age band and keeps, per cell, the
+row count, the sums of the count stats and minute-weighted sums of the rates
+and percentages. Any roll-up (per league, per squad, per league and age
+band, ...) is then a sum over cells, so summary views cost O(cells) instead
+of O(players). Ratios with known components (Cmp% = Cmp / Att, ...) are
+recomputed from the rolled-up counts.
+"""
+import numpy as np
+import pandas as pd
+
+from soccer_rollup import RATIO_COLUMNS, column_kind
+
+DIMENSIONS = ['Comp', 'Squad', 'Pos', 'AgeBand']
+# Age bands are right-inclusive: (-inf, 20], (20, 23], ...
+AGE_BINS = [-np.inf, 20, 23, 26, 29, 32, np.inf]
+AGE_BANDS = ['<=20', '21-23', '24-26', '27-29', '30-32', '33+']
+
+
+def age_band(age):
+    """ Age band label of each value of an Age column (NaN stays missing) """
+    return pd.cut(pd.to_numeric(age, errors='coerce'), AGE_BINS, labels=AGE_BANDS)
+
+
+class AggregateCube:
+    """ Per-cell sums over the dimensions present in data, rolled up on demand
+
+    stats defaults to every numeric stat column (see soccer_rollup.column_kind);
+    rates and percentages are weighted by minutes, so without Min they are
+    left out by default and rejected if asked for.
+    """
+
+    def __init__(self, data, stats=None):
+        self.dimensions = [dim for dim in DIMENSIONS if dim in data.columns or (dim == 'AgeBand' and 'Age' in data)]
+        if stats is None:
+            kinds = {col: column_kind(col, data[col].dtype) for col in data.columns}
+            stats = [col for col, kind in kinds.items() if kind == 'sum' or (kind != 'primary' and 'Min' in data.columns)]
+        self.kinds = {col: column_kind(col, data[col].dtype) for col in stats}
+        self.cells = self._cells(data).reset_index(drop=not self.dimensions)
+
+    def _cells(self, data, sign=1):
+        """ Measures of data summed per cell, indexed by the dimensions
+
+        sign (a scalar or one value per row) is 1 to add rows and -1 to take them out.
+        """
+        minutes = data['Min'].to_numpy(dtype=np.float64, na_value=0) if 'Min' in data.columns else None
+        measures = {}
+        for col, kind in self.kinds.items():
+            values = data[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            if kind == 'sum':
+                measures[col] = sign * values
+            elif minutes is not None:
+                present = ~np.isnan(values)
+                measures[col] = sign * np.where(present, values * minutes, 0.0)
+                measures[f'{col}__weight'] = sign * np.where(present, minutes, 0.0)
+            else:
+                raise ValueError(f"Min is needed to aggregate the rate column {col!r}")
+        measures['count'] = np.broadcast_to(sign, len(data))
+        keys = {dim: (age_band(data['Age']) if dim == 'AgeBand' else data[dim]) for dim in self.dimensions}
+        frame = pd.concat([pd.DataFrame(keys).reset_index(drop=True), pd.DataFrame(measures)], axis=1)
+        return self._sum_cells(frame)
+
+    def _sum_cells(self, frame):
+        """ frame summed per cell; without any dimension loaded the cube is a single grand-total cell """
+        if not self.dimensions:
+            return frame.sum(min_count=1).to_frame().T
+        return frame.groupby(self.dimensions, observed=True, dropna=False, sort=True).sum(min_count=1)
+
+    def update(self, removed=None, added=None):
+        """ Take the rows of removed out of the cells and add the rows of added, touching only their cells """
+        parts = [(rows, sign) for rows, sign in ((removed, -1), (added, 1)) if rows is not None and len(rows)]
+        if not parts:
+            return
+        rows = pd.concat([rows for rows, _ in parts], ignore_index=True)
+        delta = self._cells(rows, np.concatenate([np.full(len(rows), sign) for rows, sign in parts]))
+        cells = self._sum_cells(pd.concat([self.cells, delta.reset_index(drop=not self.dimensions)]))
+        self.cells = cells[cells['count'] > 0].reset_index(drop=not self.dimensions)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def rollup(self, by=(), stats=None, **where):
+        """ Roll the cube up to the dimensions in by (none: one grand-total row)
+
+        where restricts cells by dimension value(s), e.g. Comp='es La Liga' or
+        AgeBand=['<=20', '21-23']. Returns count (rows), sums for count stats
+        and minute-weighted means for rates, indexed by the by dimensions.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        unknown = [dim for dim in by + list(where) if dim not in self.dimensions]
+        if unknown:
+            raise ValueError(f"Unknown dimensions {unknown}, expected some of {self.dimensions}")
+        stats = list(self.kinds) if stats is None else [stats] if isinstance(stats, str) else list(stats)
+        missing = [col for col in stats if col not in self.kinds]
+        if missing:
+            raise ValueError(f"Columns {missing} are not in the cube (rates need Min to be loaded)")
+
+        cells = self.cells
+        for dim, values in where.items():
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            cells = cells[cells[dim].isin(values)]
+        needed = set(stats)
+        for col in stats:
+            if col in RATIO_COLUMNS:
+                numerator, denominators, _ = RATIO_COLUMNS[col]
+                if all(part in self.kinds for part in [numerator, *denominators]):
+                    needed.update([numerator, *denominators])
+        measures = [m for col in self.kinds if col in needed
+                    for m in ((col,) if self.kinds[col] == 'sum' else (col, f'{col}__weight'))]
+        if by:
+            totals = cells.groupby(by, observed=True, dropna=False)[measures + ['count']].sum(min_count=1)
+        else:
+            totals = cells[measures + ['count']].sum(min_count=1).to_frame().T
+        totals['count'] = totals['count'].fillna(0).astype(np.int64)
+
+        columns = {'count': totals['count']}
+        for col in stats:
+            if self.kinds[col] == 'sum':
+                columns[col] = totals[col]
+                continue
+            weight = totals[f'{col}__weight']
+            columns[col] = totals[col] / weight.where(weight > 0)
+            numerator, denominators, scale = RATIO_COLUMNS.get(col, (None, [], 1))
+            if numerator in totals and all(part in totals for part in denominators):
+                total = sum(totals[part] for part in denominators)
+                columns[col] = totals[numerator] / total.where(total > 0) * scale
+        return pd.DataFrame(columns, index=totals.index)
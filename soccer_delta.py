@@ -0,0 +1,118 @@
+"""
+soccer_delta.py
+
+Incremental refreshes for SOCCERAPI.apply_delta. A delta is a CSV (or
+DataFrame) of player rows keyed by Player + Squad: rows whose key is already
+loaded overwrite the columns the delta carries, unknown keys are appended as
+new rows. Only the cells that actually change are written, and only the
+touched columns are copied, so weekly updates of a few hundred rows do not
+rebuild the table.
+"""
+import numpy as np
+import pandas as pd
+
+DELTA_KEYS = ['Player', 'Squad']
+
+
+def read_delta(delta, columns):
+    """ Delta rows as a DataFrame restricted to known columns; later duplicates of a key win """
+    df = delta.copy() if isinstance(delta, pd.DataFrame) else pd.read_csv(delta)
+    missing = [key for key in DELTA_KEYS if key not in df.columns]
+    if missing:
+        raise ValueError(f"Delta is missing the key columns {missing}")
+    unknown = [col for col in df.columns if col not in columns]
+    if unknown:
+        raise ValueError(f"Delta has columns that are not loaded: {unknown}")
+    return df.drop_duplicates(DELTA_KEYS, keep='last').reset_index(drop=True)
+
+
+def match_rows(data, players, delta):
+    """ (row ids of data, delta positions updating them, delta positions of new rows) """
+    squads = data['Squad'].to_numpy(dtype=object)
+    rows, updates, inserts = [], [], []
+    for i, (name, squad) in enumerate(zip(delta['Player'], delta['Squad'])):
+        found = [row for row in players.lookup(name) if squads[row] == squad]
+        if found:
+            rows.append(found[0])
+            updates.append(i)
+        else:
+            inserts.append(i)
+    return np.asarray(rows, dtype=np.intp), np.asarray(updates, dtype=np.intp), np.asarray(inserts, dtype=np.intp)
+
+
+def _equal(a, b):
+    a, b = a.astype(object).to_numpy(), b.astype(object).to_numpy()
+    return (a == b) | (pd.isna(a) & pd.isna(b))
+
+
+def _same(old, new):
+    """ Elementwise equality of two aligned Series, NaN equal to NaN, compared in old's dtype
+
+    Values that old's dtype cannot hold exactly (4.5 in an integer column)
+    differ, except for rounding to the precision of a float column.
+    """
+    try:
+        cast = new.astype(old.dtype)
+    except (TypeError, ValueError):
+        return np.zeros(len(old), dtype=bool)
+    same = _equal(old, cast)
+    if not (isinstance(old.dtype, np.dtype) and old.dtype.kind == 'f'):
+        same &= _equal(new, cast)
+    return same
+
+
+def changed_cells(data, rows, values):
+    """ (boolean row mask, changed columns, values) of values against the same rows of data
+
+    Missing cells in values mean "no change" and are filled from data.
+    """
+    changed = np.zeros(len(rows), dtype=bool)
+    columns, filled = [], {}
+    for col in values.columns:
+        old, new = data[col].iloc[rows].reset_index(drop=True), values[col].reset_index(drop=True)
+        differs = ~_same(old, new) & new.notna().to_numpy()
+        if differs.any():
+            changed |= differs
+            columns.append(col)
+            filled[col] = new.astype(object).where(new.notna(), old.astype(object)).infer_objects()
+    return changed, columns, pd.DataFrame(filled, index=range(len(rows)))
+
+
+def _column_dtype(current, new):
+    """ dtype able to hold both the current column and the new values """
+    if new.dtype == current.dtype:
+        return current.dtype
+    if isinstance(current.dtype, pd.CategoricalDtype):
+        extra = pd.Index(new.dropna().unique()).difference(current.cat.categories)
+        return pd.CategoricalDtype(current.cat.categories.append(extra)) if len(extra) else current.dtype
+    # Keep narrow (compact) dtypes when the new values fit them
+    try:
+        if _same(new, new.astype(current.dtype)).all():
+            return current.dtype
+    except (TypeError, ValueError, OverflowError):
+        pass
+    return pd.concat([current.iloc[:0], new.iloc[:0]]).dtype
+
+
+def assign_rows(frame, rows, values):
+    """ Shallow copy of frame with values written into rows; only the columns of values are copied """
+    frame = frame.copy(deep=False)
+    for col in values.columns:
+        new = values[col].reset_index(drop=True)
+        updated = frame[col].astype(_column_dtype(frame[col], new))
+        updated.iloc[rows] = new.astype(updated.dtype).to_numpy()
+        frame[col] = updated
+    return frame
+
+
+def append_rows(frame, new):
+    """ frame with the rows of new appended (missing columns are NaN) """
+    new = new.reindex(columns=frame.columns)
+    frame = frame.copy(deep=False)
+    for col in frame.columns:
+        dtype = _column_dtype(frame[col], new[col])
+        if dtype != frame[col].dtype:
+            frame[col] = frame[col].astype(dtype)
+        if isinstance(dtype, pd.CategoricalDtype):
+            new[col] = pd.Categorical(new[col], dtype=dtype)
+    return pd.concat([frame, new], ignore_index=True)
@@ -0,0 +1,158 @@
+"""
+soccer_derived.py
+
+Named derived metrics (per-90 rates, goals minus xG, shot conversion, ...)
+defined as vectorized expressions over base columns or other metrics.
+DerivedColumns evaluates every metric asked for in one pass over float arrays
+of their inputs and keeps the results as columns, so each metric is computed
+once per table; a delta only drops the metrics whose inputs, directly or
+through other metrics, changed.
+
+    api.get_derived(['Gls/90', 'xG+xAG/90', 'Conv%'], level='player')
+"""
+import numpy as np
+import pandas as pd
+
+
+class Metric:
+    """ name = compute(*inputs) over float64 arrays; inputs are column or metric names """
+
+    def __init__(self, name, inputs, compute, description=''):
+        self.name = name
+        self.inputs = list(inputs)
+        self.compute = compute
+        self.description = description
+
+    def __repr__(self):
+        return f"<Metric {self.name} = f({', '.join(self.inputs)})>"
+
+
+def per90(col, name=None):
+    """ col per 90 minutes played """
+    return Metric(name or f'{col}/90', [col, 'Min'], lambda values, minutes: values / (minutes / 90),
+                  f'{col} per 90 minutes')
+
+
+def difference(a, b, name=None):
+    """ a minus b """
+    return Metric(name or f'{a}-{b}', [a, b], np.subtract, f'{a} minus {b}')
+
+
+def ratio(numerator, denominator, scale=1, name=None):
+    """ numerator / denominator * scale """
+    description = f'{numerator} per {denominator}' + (f' x {scale}' if scale != 1 else '')
+    return Metric(name or f'{numerator}/{denominator}', [numerator, denominator],
+                  lambda num, den: num / den * scale, description)
+
+
+def _metrics(*metrics):
+    return {metric.name: metric for metric in metrics}
+
+
+# Built-in metrics; names do not collide with columns of the FBref export
+METRICS = _metrics(
+    per90('Gls'), per90('Ast'), per90('G+A'), per90('xG'), per90('xAG'), per90('npxG'),
+    Metric('xG+xAG/90', ['xG/90', 'xAG/90'], np.add, 'xG plus xAG per 90 minutes'),
+    difference('Gls', 'xG'), difference('Ast', 'xAG'),
+    per90('Gls-xG'),
+    ratio('Gls', 'Sh', 100, name='Conv%'),
+    ratio('Gls', 'xG', name='Gls/xG'),
+    ratio('Gls', 'Min', name='Gls/Min'),
+)
+
+
+def dependencies(names, metrics=None):
+    """ Every metric and column the given metric names are computed from, directly or not """
+    metrics = METRICS if metrics is None else metrics
+    found, pending = [], list(names)
+    while pending:
+        name = pending.pop(0)
+        for dependency in metrics[name].inputs if name in metrics else ():
+            if dependency not in found:
+                found.append(dependency)
+                pending.append(dependency)
+    return found
+
+
+def base_columns(names, metrics=None):
+    """ Table columns that the given metric (or column) names are computed from """
+    metrics = METRICS if metrics is None else metrics
+    return [name for name in list(names) + dependencies(names, metrics) if name not in metrics]
+
+
+class DerivedColumns:
+    """ Cached derived-metric columns of one table
+
+    metrics maps names to Metric; columns holds the computed float64 arrays
+    by name and is filled on demand.
+    """
+
+    def __init__(self, data, metrics=None):
+        self.data = data
+        self.metrics = METRICS if metrics is None else metrics
+        self.columns = {}
+
+    def _order(self, names):
+        """ names and the metrics they depend on, dependencies first; raises on unknown names or cycles """
+        order, visiting = [], set()
+
+        def visit(name, path):
+            if name in order or name not in self.metrics:
+                return
+            if name in visiting:
+                raise ValueError(f"Derived metric {name!r} depends on itself ({' -> '.join(path + [name])})")
+            visiting.add(name)
+            for dependency in self.metrics[name].inputs:
+                visit(dependency, path + [name])
+            visiting.discard(name)
+            order.append(name)
+
+        unknown = [name for name in names if name not in self.metrics]
+        if unknown:
+            raise ValueError(f"Unknown derived metrics {unknown}, expected some of {sorted(self.metrics)}")
+        for name in names:
+            visit(name, [])
+        return order
+
+    def get(self, names):
+        """ {name: float64 array over every row of data}, computing the missing metrics in one pass """
+        order = [name for name in self._order(names) if name not in self.columns]
+        if order:
+            needed = list(dict.fromkeys(base_columns(order, self.metrics)))
+            missing = [col for col in needed if col not in self.data.columns]
+            if missing:
+                raise ValueError(f"Columns {missing} are not loaded (see required_columns)")
+            values = {col: self.data[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in needed}
+            computed = dict(self.columns)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                for name in order:
+                    metric = self.metrics[name]
+                    result = np.asarray(metric.compute(*(computed[col] if col in self.metrics else values[col]
+                                                         for col in metric.inputs)), dtype=np.float64)
+                    result[~np.isfinite(result)] = np.nan
+                    computed[name] = result
+            # Rebound rather than updated, so copies of this cache (see Snapshot.derive) are unaffected
+            self.columns = computed
+        return {name: self.columns[name] for name in names}
+
+    def frame(self, names, rows=None):
+        """ DataFrame of the metrics for rows (row positions; all rows by default), indexed like data """
+        columns = self.get(names)
+        index = self.data.index
+        if rows is not None:
+            columns = {name: values[rows] for name, values in columns.items()}
+            index = index[rows]
+        return pd.DataFrame(columns, index=index)
+
+    def invalidate(self, data, columns=None, metrics=None):
+        """ Point at data (the updated table) and drop the metrics computed from columns (all by default)
+
+        metrics, if given, replaces the definitions; metrics whose definition changed are dropped too.
+        """
+        previous, self.data = self.metrics, data
+        if metrics is not None:
+            self.metrics = metrics
+        stale = set(self.data.columns if columns is None else columns)
+        stale |= {name for name in set(previous) | set(self.metrics) if self.metrics.get(name) is not previous.get(name)}
+        self.columns = {name: values for name, values in self.columns.items()
+                        if name not in stale and not stale & set(dependencies([name], self.metrics))}
@@ -0,0 +1,153 @@
+"""
+soccer_index.py
+
+Precomputed indexes over the player table. FilterIndex keeps packed row
+bitmaps for the categorical columns and sorted arrays for the numeric columns
+get_data filters on, so a query is answered by AND-ing bitmaps and
+materializing the result once. PlayerIndex maps each player name to the rows
+of all their stints.
+"""
+import numpy as np
+import pandas as pd
+
+CATEGORY_INDEX_COLUMNS = ['Comp', 'Squad', 'Pos']
+RANGE_INDEX_COLUMNS = ['Gls', 'Ast', 'Age', 'Min']
+
+
+class FilterIndex:
+    """ Row bitmaps per category value and sorted arrays for range predicates """
+
+    def __init__(self, data):
+        self.n_rows = len(data)
+        self.bitmaps = {}
+        self.sorted = {}
+        for col in CATEGORY_INDEX_COLUMNS:
+            if col in data.columns:
+                self.bitmaps[col] = self._build_bitmaps(data[col])
+        for col in RANGE_INDEX_COLUMNS:
+            if col in data.columns:
+                self.sorted[col] = self._build_sorted(data[col])
+
+    def _pack(self, mask):
+        return np.packbits(mask)
+
+    def _build_bitmaps(self, col):
+        codes, uniques = pd.factorize(col)
+        return {value: self._pack(codes == code) for code, value in enumerate(uniques)}
+
+    def _build_sorted(self, col):
+        values = col.to_numpy(dtype=np.float64, na_value=np.nan)
+        rows = np.flatnonzero(~np.isnan(values))
+        order = rows[np.argsort(values[rows], kind='stable')]
+        return values[order], order
+
+    def _rows_to_bits(self, rows):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[rows] = True
+        return self._pack(mask)
+
+    def all_rows(self):
+        """ Bitmap with every row set """
+        return self._pack(np.ones(self.n_rows, dtype=bool))
+
+    def isin(self, column, values):
+        """ Bitmap of rows whose column equals any of values """
+        bitmaps = self.bitmaps[column]
+        bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for value in values:
+            if value in bitmaps:
+                bits |= bitmaps[value]
+        return bits
+
+    def between(self, column, lo=None, hi=None):
+        """ Bitmap of rows with lo <= column <= hi (either bound optional, NaN never matches) """
+        values, order = self.sorted[column]
+        start = 0 if lo is None else np.searchsorted(values, lo, side='left')
+        stop = len(values) if hi is None else np.searchsorted(values, hi, side='right')
+        return self._rows_to_bits(order[start:stop])
+
+    def update(self, data, rows, columns=None):
+        """ Re-index rows of data (the updated table) whose values changed or that were appended
+
+        columns limits the work to the indexed columns that changed (all of
+        them by default, as needed for new rows).
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        # New containers (and new arrays below), so copies of this index made with copy.copy are unaffected
+        self.bitmaps = {col: dict(bitmaps) for col, bitmaps in self.bitmaps.items()}
+        self.sorted = dict(self.sorted)
+        if len(data) > self.n_rows:
+            n_bytes = (len(data) + 7) // 8
+            for bitmaps in self.bitmaps.values():
+                for value, bits in bitmaps.items():
+                    bitmaps[value] = np.concatenate([bits, np.zeros(n_bytes - len(bits), dtype=np.uint8)])
+            self.n_rows = len(data)
+        if not len(rows):
+            return
+        row_bits = self._rows_to_bits(rows)
+        for col, bitmaps in self.bitmaps.items():
+            if columns is not None and col not in columns:
+                continue
+            for value in list(bitmaps):
+                bitmaps[value] = bitmaps[value] & ~row_bits
+                if not bitmaps[value].any():
+                    del bitmaps[value]
+            codes, uniques = pd.factorize(data[col].iloc[rows])
+            for code, value in enumerate(uniques):
+                bits = self._rows_to_bits(rows[codes == code])
+                bitmaps[value] = bitmaps[value] | bits if value in bitmaps else bits
+        for col, (values, order) in self.sorted.items():
+            if columns is not None and col not in columns:
+                continue
+            keep = ~np.isin(order, rows)
+            values, order = values[keep], order[keep]
+            new = data[col].iloc[rows].to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = np.flatnonzero(~np.isnan(new))
+            valid = valid[np.argsort(new[valid], kind='stable')]
+            at = np.searchsorted(values, new[valid], side='right')
+            self.sorted[col] = np.insert(values, at, new[valid]), np.insert(order, at, rows[valid])
+
+    def values(self, column):
+        """ Distinct non-null values of an indexed categorical column """
+        return list(self.bitmaps[column])
+
+    def to_mask(self, bits):
+        """ Unpack a bitmap into a boolean row mask """
+        return np.unpackbits(bits, count=self.n_rows).astype(bool)
+
+
+class PlayerIndex:
+    """ Player name -> row ids, one row per club the player appeared for """
+
+    def __init__(self, data):
+        codes, uniques = pd.factorize(data['Player'])
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # Rows with a missing name (code -1) sort first and are skipped
+        start = len(codes) - counts.sum()
+        self.rows = {}
+        for name, count in zip(uniques, counts):
+            self.rows[name] = order[start:start + count]
+            start += count
+
+    def add(self, data, rows):
+        """ Index rows appended to data """
+        self.rows = dict(self.rows)
+        for row, name in zip(rows, data['Player'].iloc[rows]):
+            if name == name:
+                self.rows[name] = np.append(self.rows.get(name, np.empty(0, dtype=np.intp)), row)
+
+    def __contains__(self, name):
+        return name in self.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def lookup(self, name):
+        """ Row ids for a player, in table order (empty if unknown) """
+        return self.rows.get(name, np.empty(0, dtype=np.intp))
+
+    def lookup_many(self, names):
+        """ Concatenated row ids for several players, grouped by name in the order given """
+        rows = [self.rows[name] for name in names if name in self.rows]
+        return np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
@@ -0,0 +1,170 @@
+"""
+soccer_normalize.py
+
+Vectorized stat normalization against fixed reference distributions. The
+reference population (the whole loaded table, optionally split by league or
+position group) is summarized once per column and reused, so the scale of a
+radar chart no longer depends on which subset of players is being shown.
+"""
+import numpy as np
+import pandas as pd
+
+METHODS = ('minmax', 'zscore', 'percentile', 'per90')
+
+# First listed position -> position group, matching radar.py's categories
+POSITION_GROUPS = {'FW': 'ATTACK', 'MF': 'ATTACK', 'DF': 'DEFENSE', 'GK': 'GOALKEEPER'}
+
+# Stats compared for each position group (radar axes and similarity features)
+STAT_GROUPS = {
+    'ATTACK': ['Min', 'Gls', 'Ast', 'KP', 'PrgC'],
+    'DEFENSE': ['Min', 'Tkl', 'TklW', 'Blocks', 'Int', 'Clr'],
+    'GOALKEEPER': ['Min', 'GA', 'Saves', 'Save%', 'CS'],
+}
+
+
+def position_groups(pos):
+    """ Map a Pos column ('DF,MF', 'GK', ...) to ATTACK / DEFENSE / GOALKEEPER """
+    primary = pos.astype(str).str.split(',').str[0]
+    return primary.map(POSITION_GROUPS).where(pos.notna())
+
+
+def per90_values(df, cols):
+    """ Per-90-minute rates for cols as an (n_rows, n_cols) float array """
+    values = df[cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    nineties = df['Min'].to_numpy(dtype=np.float64, na_value=np.nan) / 90
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = values / nineties[:, None]
+    rates[~np.isfinite(rates)] = np.nan
+    return rates
+
+
+class Reference:
+    """ Summary of one column's distribution in every group of a scope """
+
+    def __init__(self, values, codes, n_groups):
+        self.min = np.full(n_groups, np.nan)
+        self.max = np.full(n_groups, np.nan)
+        self.mean = np.full(n_groups, np.nan)
+        self.std = np.full(n_groups, np.nan)
+        self.sorted = []
+        for group in range(n_groups):
+            group_values = values[(codes == group) & ~np.isnan(values)]
+            group_values.sort()
+            self.sorted.append(group_values)
+            if len(group_values):
+                self.min[group], self.max[group] = group_values[0], group_values[-1]
+                self.mean[group], self.std[group] = group_values.mean(), group_values.std()
+
+
+class StatNormalizer:
+    """ Min-max, z-score, percentile-rank and per-90 scaling over a reference population
+
+    scope selects how the population is split: None for one pool, 'position'
+    for position groups, or any column name such as 'Comp' for one pool per
+    value. Reference summaries are computed on first use and cached.
+    """
+
+    def __init__(self, data, scale_min=0, scale_max=100, per90_min_minutes=450):
+        self.data = data
+        # Players under this many minutes have noisy rates, so they are left out of per-90 references
+        self.per90_min_minutes = per90_min_minutes
+        self.scale_min = scale_min
+        self.scale_max = scale_max
+        self.groups = {}
+        self.references = {}
+
+    def invalidate(self, data, columns=None):
+        """ Switch to an updated reference table, dropping the summaries that read any of columns
+
+        columns=None (or a change in the number of rows) drops everything.
+        """
+        resized = len(data) != len(self.data)
+        self.data = data
+        if columns is None or resized:
+            self.groups, self.references = {}, {}
+            return
+        columns = set(columns)
+
+        def stale(scope, per90=False, col=None):
+            scope_column = None if scope is None else 'Pos' if scope == 'position' else scope
+            return scope_column in columns or col in columns or (per90 and 'Min' in columns)
+
+        self.groups = {scope: group for scope, group in self.groups.items() if not stale(scope)}
+        self.references = {key: ref for key, ref in self.references.items() if not stale(*key)}
+
+    def _scope_keys(self, df, scope):
+        if scope is None:
+            return pd.Series(0, index=df.index)
+        if scope == 'position':
+            return position_groups(df['Pos'])
+        return df[scope]
+
+    def _groups(self, scope):
+        if scope not in self.groups:
+            codes, uniques = pd.factorize(self._scope_keys(self.data, scope))
+            self.groups[scope] = (codes, pd.Index(uniques))
+        return self.groups[scope]
+
+    def references_for(self, cols, scope=None, per90=False):
+        """ Reference summaries for cols, computing any missing ones in one pass """
+        codes, groups = self._groups(scope)
+        missing = [col for col in cols if (scope, per90, col) not in self.references]
+        if missing:
+            if per90:
+                values = per90_values(self.data, missing)
+                values[self.data['Min'].to_numpy() < self.per90_min_minutes] = np.nan
+            else:
+                values = self.data[missing].to_numpy(dtype=np.float64, na_value=np.nan)
+            for j, col in enumerate(missing):
+                self.references[(scope, per90, col)] = Reference(values[:, j], codes, len(groups))
+        return [self.references[(scope, per90, col)] for col in cols]
+
+    def transform(self, df, cols, method='minmax', scope=None, per90=False):
+        """ Return a copy of df with cols scaled against the reference population
+
+        per90=True converts counts to per-90 rates before scaling; the 'per90'
+        method returns those rates unscaled. Rows whose group is not in the
+        reference population get NaN.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown normalization method {method!r}, expected one of {METHODS}")
+        per90 = per90 or method == 'per90'
+        values = per90_values(df, cols) if per90 else df[cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        result = df.copy()
+        if method == 'per90':
+            result[cols] = values
+            return result
+
+        refs = self.references_for(cols, scope, per90)
+        _, groups = self._groups(scope)
+        rows = groups.get_indexer(self._scope_keys(df, scope))
+        known = rows >= 0
+        g = rows[known]
+        v = values[known]
+        scaled = np.full(values.shape, np.nan)
+        span = self.scale_max - self.scale_min
+
+        if method == 'minmax':
+            lo = np.column_stack([ref.min for ref in refs])[g]
+            width = np.column_stack([ref.max for ref in refs])[g] - lo
+            with np.errstate(divide='ignore', invalid='ignore'):
+                unit = np.where(width > 0, (v - lo) / width, 0.0)
+            scaled[known] = unit * span + self.scale_min
+        elif method == 'zscore':
+            mean = np.column_stack([ref.mean for ref in refs])[g]
+            std = np.column_stack([ref.std for ref in refs])[g]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scaled[known] = np.where(std > 0, (v - mean) / std, 0.0)
+        else:
+            unit = np.full(v.shape, np.nan)
+            for j, ref in enumerate(refs):
+                for group, group_values in enumerate(ref.sorted):
+                    in_group = g == group
+                    if in_group.any() and len(group_values):
+                        ranks = np.searchsorted(group_values, v[in_group, j], side='right')
+                        unit[in_group, j] = ranks / len(group_values)
+            scaled[known] = unit * span + self.scale_min
+
+        scaled[np.isnan(values)] = np.nan
+        result[cols] = scaled
+        return result
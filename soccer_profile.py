@@ -0,0 +1,195 @@
+"""
+soccer_profile.py
+
+Opt-in instrumentation for SOCCERAPI. Profiler.attach() wraps the public
+query methods of one SOCCERAPI instance (the class itself is untouched, so
+an API without a profiler runs exactly as before) and records per-call
+timings, rows and bytes returned, and the rows left after each get_data
+filter stage. Records can be logged as JSON lines, summarized, or exported in
+the Prometheus text format together with the result cache counters.
+
+    api = SOCCERAPI("players_data-2024_2025.csv", profile=True)
+    api.get_data(min_goals=5)
+    print(api.profiler.report())
+    print(api.profiler.prometheus(api.cache_stats()))
+"""
+import contextlib
+import functools
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+from soccer_cache import result_nbytes
+
+PROFILED_METHODS = ['load_data', 'load_seasons', 'get_data', 'get_unique_values', 'get_column_range',
+                    'get_squads_by_competition', 'aggregate', 'normalize', 'similar_players', 'get_player_rows',
+                    'get_player_position', 'get_player_positions', 'get_player_squads', 'get_player_totals',
+                    'get_player_stats', 'summarize', 'get_derived', 'apply_delta']
+METRIC_PREFIX = 'soccer_api'
+
+
+class Profiler:
+    """ Collects call records for one SOCCERAPI instance
+
+    logger, if given, receives every record as a JSON line at INFO level.
+    max_records bounds the in-memory record history (totals are kept for
+    every call regardless).
+    """
+
+    def __init__(self, logger=None, max_records=10000):
+        self.logger = logger
+        self.max_records = max_records
+        self.records = []
+        self.totals = defaultdict(lambda: {'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                           'rows': 0, 'bytes': 0})
+        self.stage_totals = defaultdict(lambda: {'rows_in': 0, 'rows_out': 0})
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def attach(self, api):
+        """ Wrap api's public methods with timing; returns api """
+        for name in PROFILED_METHODS:
+            method = getattr(type(api), name, None)
+            if method is not None:
+                setattr(api, name, self._wrap(name, method.__get__(api)))
+        api.profiler = self
+        return api
+
+    @staticmethod
+    def detach(api):
+        """ Restore api's plain methods """
+        for name in PROFILED_METHODS:
+            api.__dict__.pop(name, None)
+        api.profiler = None
+
+    def _wrap(self, name, method):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            with self.span(name) as record:
+                result = method(*args, **kwargs)
+                record['rows'], record['bytes'] = _result_size(result)
+                return result
+        return timed
+
+    def _current(self):
+        stack = getattr(self.local, 'stack', None)
+        return stack[-1] if stack else {}
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """ Time a block (a method call, or a stage such as 'render' in a script) """
+        stack = self.local.__dict__.setdefault('stack', [])
+        record = {'event': 'call', 'method': name, 'depth': len(stack)}
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['ms'] = (time.perf_counter() - start) * 1000
+            stack.pop()
+            self._finish(record)
+
+    def note_stages(self, stages):
+        """ Attach [(stage, rows in, rows out), ...] from a get_data or query filter to the current call """
+        current = self._current()
+        current['stages'] = [{'stage': stage, 'rows_in': rows_in, 'rows_out': rows_out}
+                             for stage, rows_in, rows_out in stages]
+
+    def _finish(self, record):
+        with self.lock:
+            totals = self.totals[record['method']]
+            totals['calls'] += 1
+            totals['errors'] += 'error' in record
+            totals['seconds'] += record['ms'] / 1000
+            totals['max_seconds'] = max(totals['max_seconds'], record['ms'] / 1000)
+            totals['rows'] += record.get('rows') or 0
+            totals['bytes'] += record.get('bytes') or 0
+            for stage in record.get('stages', ()):
+                stage_totals = self.stage_totals[stage['stage']]
+                stage_totals['rows_in'] += stage['rows_in']
+                stage_totals['rows_out'] += stage['rows_out']
+            self.records.append(record)
+            if len(self.records) > self.max_records:
+                del self.records[:len(self.records) - self.max_records]
+        if self.logger is not None:
+            self.logger.info(json.dumps(record, default=str))
+
+    def reset(self):
+        """ Drop records and totals """
+        with self.lock:
+            self.records.clear()
+            self.totals.clear()
+            self.stage_totals.clear()
+
+    def summary(self):
+        """ {method: {calls, errors, seconds, mean_ms, max_ms, rows, bytes}} """
+        with self.lock:
+            return {name: {**totals, 'mean_ms': totals['seconds'] * 1000 / totals['calls'],
+                           'max_ms': totals['max_seconds'] * 1000}
+                    for name, totals in self.totals.items()}
+
+    def report(self):
+        """ Human-readable table of the summary, slowest methods first """
+        rows = sorted(self.summary().items(), key=lambda item: -item[1]['seconds'])
+        lines = [f"{'method':<28} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'rows':>9} {'MB':>8}"]
+        for name, s in rows:
+            lines.append(f"{name:<28} {s['calls']:>7} {s['seconds'] * 1000:>10.2f} {s['mean_ms']:>9.3f} "
+                         f"{s['max_ms']:>9.3f} {s['rows']:>9} {s['bytes'] / 1e6:>8.2f}")
+        with self.lock:
+            for stage, s in self.stage_totals.items():
+                lines.append(f"  filter stage {stage:<14} rows in {s['rows_in']:>9}  rows out {s['rows_out']:>9}")
+        return '\n'.join(lines)
+
+    def prometheus(self, cache_stats=None):
+        """ Metrics in the Prometheus text exposition format """
+        p = METRIC_PREFIX
+        lines = [f'# TYPE {p}_calls_total counter', f'# TYPE {p}_errors_total counter',
+                 f'# TYPE {p}_call_seconds_total counter', f'# TYPE {p}_call_seconds_max gauge',
+                 f'# TYPE {p}_rows_returned_total counter', f'# TYPE {p}_bytes_materialized_total counter']
+        for name, s in sorted(self.summary().items()):
+            label = f'{{method="{name}"}}'
+            lines += [f'{p}_calls_total{label} {s["calls"]}', f'{p}_errors_total{label} {s["errors"]}',
+                      f'{p}_call_seconds_total{label} {s["seconds"]:.6f}',
+                      f'{p}_call_seconds_max{label} {s["max_seconds"]:.6f}',
+                      f'{p}_rows_returned_total{label} {s["rows"]}',
+                      f'{p}_bytes_materialized_total{label} {s["bytes"]}']
+        lines += [f'# TYPE {p}_filter_rows_in_total counter', f'# TYPE {p}_filter_rows_out_total counter']
+        with self.lock:
+            for stage, s in sorted(self.stage_totals.items()):
+                label = f'{{stage="{stage}"}}'
+                lines += [f'{p}_filter_rows_in_total{label} {s["rows_in"]}',
+                          f'{p}_filter_rows_out_total{label} {s["rows_out"]}']
+        if cache_stats:
+            for key in ('hits', 'misses', 'evictions'):
+                lines += [f'# TYPE {p}_cache_{key}_total counter', f'{p}_cache_{key}_total {cache_stats[key]}']
+            for key in ('entries', 'bytes', 'hit_rate'):
+                lines += [f'# TYPE {p}_cache_{key} gauge', f'{p}_cache_{key} {cache_stats[key]}']
+        return '\n'.join(lines) + '\n'
+
+
+def _result_size(result):
+    """ (rows, bytes) of a query result """
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result), result_nbytes(result)
+    if isinstance(result, (list, tuple, dict)):
+        return len(result), result_nbytes(result)
+    return None, None
+
+
+def json_logger(name='soccer_api.profile', stream=None):
+    """ Logger that writes each profile record as one JSON line """
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
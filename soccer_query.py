@@ -0,0 +1,250 @@
+"""
+soccer_query.py
+
+Lazy, chainable queries over the SOCCERAPI tables. A Query only records its
+predicates, projection, ordering and limit; nothing runs until execute().
+The planner then orders the predicates by estimated selectivity (exact row
+counts for columns in the FilterIndex, fixed guesses for the rest), answers
+the indexed ones with row bitmaps and evaluates the others only on the rows
+still left, reads just the columns it needs, and materializes the result
+once. order_by + limit keeps the top rows with a partial selection instead
+of sorting everything.
+
+    api.query().where('Comp', 'in', ['es La Liga', 'it Serie A']).where('Pos', 'has', 'FW') \\
+        .select('Player', 'Squad', 'G+A').order_by('G+A').limit(10).execute()
+"""
+import copy
+import re
+
+import numpy as np
+import pandas as pd
+
+OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'in', 'not in', 'between', 'has')
+RANGE_OPERATORS = ('==', '<', '<=', '>', '>=', 'between')
+# Share of rows an unindexed predicate is expected to keep, for ordering only
+SELECTIVITY_GUESS = {'==': 0.05, 'in': 0.05, 'has': 0.3, 'between': 0.3, '<': 0.5, '<=': 0.5, '>': 0.5,
+                     '>=': 0.5, '!=': 0.95, 'not in': 0.95}
+
+
+def _freeze(value):
+    return tuple(value) if isinstance(value, (list, tuple, set, frozenset)) else value
+
+
+class Predicate:
+    """ column <op> value; NaN never matches """
+
+    def __init__(self, column, op, value):
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator {op!r}, expected one of {OPERATORS}")
+        if op in ('in', 'not in'):
+            value = [value] if isinstance(value, str) or not hasattr(value, '__iter__') else list(value)
+        if op == 'between' and len(value) != 2:
+            raise ValueError("'between' expects (lo, hi); use None for an open bound")
+        self.column, self.op, self.value = column, op, value
+
+    def key(self):
+        return self.column, self.op, _freeze(self.value)
+
+    def __repr__(self):
+        return f"{self.column} {self.op} {self.value!r}"
+
+    def bounds(self):
+        """ (lo, hi, lo inclusive, hi inclusive) of a range predicate """
+        if self.op == 'between':
+            return self.value[0], self.value[1], True, True
+        if self.op == '==':
+            return self.value, self.value, True, True
+        if self.op in ('>', '>='):
+            return self.value, None, self.op == '>=', True
+        return None, self.value, True, self.op == '<='
+
+    def index_rows(self, index):
+        """ Matching row ids from the index's sorted array, or None if the index cannot answer """
+        if self.column not in index.sorted or self.op not in RANGE_OPERATORS:
+            return None
+        values, order = index.sorted[self.column]
+        lo, hi, lo_inclusive, hi_inclusive = self.bounds()
+        start = 0 if lo is None else np.searchsorted(values, lo, side='left' if lo_inclusive else 'right')
+        stop = len(values) if hi is None else np.searchsorted(values, hi, side='right' if hi_inclusive else 'left')
+        return np.sort(order[start:max(start, stop)])
+
+    def index_bits(self, index):
+        """ Matching row bitmap from the index's category bitmaps, or None if the index cannot answer """
+        if self.column not in index.bitmaps or self.op not in ('==', 'in'):
+            return None
+        return index.isin(self.column, self.value if self.op == 'in' else [self.value])
+
+    def evaluate(self, column):
+        """ Boolean mask over a Series holding this predicate's column for the candidate rows """
+        op, value = self.op, self.value
+        if op == 'in':
+            result = column.isin(value)
+        elif op == 'not in':
+            result = ~column.isin(value) & column.notna()
+        elif op == 'has':
+            # Composite values such as Pos 'DF,MF'
+            pattern = rf'(?:^|,){re.escape(str(value))}(?:,|$)'
+            result = column.astype('string').str.contains(pattern, regex=True)
+        elif op == 'between':
+            lo, hi = value
+            result = pd.Series(True, index=column.index) if lo is None else column >= lo
+            if hi is not None:
+                result = result & (column <= hi)
+        elif op == '!=':
+            result = (column != value) & column.notna()
+        else:
+            result = {'==': column.__eq__, '<': column.__lt__, '<=': column.__le__, '>': column.__gt__,
+                      '>=': column.__ge__}[op](value)
+        return result.to_numpy(dtype=bool, na_value=False)
+
+
+class Query:
+    """ A lazy query on one SOCCERAPI table; every builder method returns a new Query """
+
+    def __init__(self, api, level='stint'):
+        self.api = api
+        self.level = level
+        self.predicates = ()
+        self.columns = None
+        self.order = None
+        self.n = None
+
+    def _with(self, **changes):
+        query = copy.copy(self)
+        query.__dict__.update(changes)
+        return query
+
+    def where(self, column=None, op='==', value=None, **equals):
+        """ Add a predicate: where('Gls', '>=', 5), where('Pos', 'has', 'FW') or where(Comp='es La Liga')
+
+        Operators are ==, !=, <, <=, >, >=, in, not in, between ((lo, hi),
+        inclusive, either bound None) and has (one of the comma-separated
+        values, for Pos). Predicates are ANDed.
+        """
+        predicates = [Predicate(column, op, value)] if column is not None else []
+        predicates += [Predicate(col, 'in' if isinstance(val, (list, tuple, set)) else '==', val)
+                       for col, val in equals.items()]
+        return self._with(predicates=self.predicates + tuple(predicates))
+
+    def select(self, *columns):
+        """ Only return these columns (all columns if never called) """
+        columns = columns[0] if len(columns) == 1 and isinstance(columns[0], (list, tuple)) else columns
+        return self._with(columns=tuple(columns))
+
+    def order_by(self, column, ascending=False):
+        """ Sort by one column, highest (or last in text order) first unless ascending; NaN sorts last either way """
+        return self._with(order=(column, ascending))
+
+    def limit(self, n):
+        """ Keep the first n rows (after ordering) """
+        if int(n) < 0:
+            raise ValueError(f"limit expects a row count >= 0, got {n}")
+        return self._with(n=int(n))
+
+    def key(self):
+        return ('query', self.level, tuple(p.key() for p in self.predicates), self.columns, self.order, self.n)
+
+    def _check(self, data):
+        needed = [p.column for p in self.predicates] + list(self.columns or ()) + ([self.order[0]] if self.order else [])
+        missing = sorted({col for col in needed if col not in data.columns})
+        if missing:
+            raise ValueError(f"Columns {missing} are not loaded (see required_columns)")
+
+    def plan(self, snapshot=None):
+        """ [(predicate, 'index' or 'scan', estimated rows, index matches)] in execution order """
+        data, index = (snapshot or self.api.snapshot).level(self.level)
+        self._check(data)
+        steps = []
+        for predicate in self.predicates:
+            bits = predicate.index_bits(index)
+            rows = predicate.index_rows(index) if bits is None else None
+            if bits is not None:
+                steps.append((predicate, 'index', int(np.unpackbits(bits, count=index.n_rows).sum()), bits))
+            elif rows is not None:
+                steps.append((predicate, 'index', len(rows), rows))
+            else:
+                steps.append((predicate, 'scan', SELECTIVITY_GUESS[predicate.op] * len(data), None))
+        # Index lookups are cheap and exact, so they go first; then the most selective scans
+        steps.sort(key=lambda step: (step[1] != 'index', step[2]))
+        return steps
+
+    def explain(self):
+        """ The execution plan as text """
+        lines = [f"{step:<6} {str(predicate):<40} ~{estimate:.0f} rows" for predicate, step, estimate, _ in self.plan()]
+        if self.order:
+            how = f"top {self.n} (partial selection)" if self.n is not None else "full sort"
+            lines.append(f"order  {self.order[0]} {'asc' if self.order[1] else 'desc'}, {how}")
+        elif self.n is not None:
+            lines.append(f"limit  {self.n}")
+        lines.append(f"output {list(self.columns) if self.columns else 'all columns'}")
+        return '\n'.join(lines)
+
+    def execute(self):
+        """ Run the query and return a DataFrame (results are cached with get_data's) """
+        snapshot = self.api.snapshot
+        with self.api.span('query'):
+            result = self.api.results.get_or_compute((snapshot.version,) + self.key(),
+                                                     lambda: self._execute(snapshot))
+        return result.copy(deep=False)
+
+    def _execute(self, snapshot):
+        data, rows = self._rows(snapshot)
+        rows = self._order(data, rows)
+        columns = list(dict.fromkeys(self.columns)) if self.columns else list(data.columns)
+        return data.iloc[rows, data.columns.get_indexer(columns)].copy()
+
+    def _rows(self, snapshot):
+        """ (table, ascending row ids passing every predicate) """
+        data, index = snapshot.level(self.level)
+        stages = [] if self.api.profiler is not None else None
+        rows = None
+        n_rows = len(data)
+        for predicate, step, _, found in self.plan(snapshot):
+            before = n_rows if rows is None else len(rows)
+            if step == 'index':
+                if found.dtype == np.uint8:
+                    found = np.flatnonzero(index.to_mask(found))
+                rows = found if rows is None else rows[np.isin(rows, found, assume_unique=True)]
+            else:
+                column = data[predicate.column] if rows is None else data[predicate.column].iloc[rows]
+                keep = predicate.evaluate(column)
+                rows = np.flatnonzero(keep) if rows is None else rows[keep]
+            if stages is not None:
+                stages.append((predicate.column, before, len(rows)))
+            if not len(rows):
+                break
+        if stages is not None:
+            self.api.profiler.note_stages(stages)
+        return data, np.arange(n_rows) if rows is None else rows
+
+    def _order(self, data, rows):
+        if self.order is None:
+            return rows if self.n is None else rows[:self.n]
+        column, ascending = self.order
+        values = data[column].iloc[rows]
+        k = len(rows) if self.n is None else min(self.n, len(rows))
+        if not pd.api.types.is_numeric_dtype(values.dtype):
+            # Text and categories: a stable sort of the values themselves
+            order = values.reset_index(drop=True).sort_values(ascending=ascending, kind='stable', na_position='last')
+            return rows[order.index.to_numpy()[:k]]
+        keys = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        # Missing values sort last either way; np.where also leaves the (possibly read-only) column alone
+        keys = np.where(np.isnan(keys), np.inf, keys if ascending else -keys)
+        if k == 0:
+            return rows[:0]
+        if k < len(rows):
+            # Partial selection; ties at the cut keep table order, as a stable sort would
+            kth = np.partition(keys, k - 1)[k - 1]
+            better = np.flatnonzero(keys < kth)
+            picked = np.concatenate([better, np.flatnonzero(keys == kth)[:k - len(better)]])
+        else:
+            picked = np.arange(len(rows))
+        picked = picked[np.lexsort((picked, keys[picked]))]
+        return rows[picked]
+
+    def count(self):
+        """ Number of matching rows (ignores limit) """
+        return len(self._rows(self.api.snapshot)[1])
+
+    def __repr__(self):
+        return f"<Query level={self.level!r}\n{self.explain()}>"
@@ -0,0 +1,167 @@
+"""
+soccer_rollup.py
+
+Season totals per player. Players who changed clubs mid-season have one row
+(stint) per club; PlayerRollup combines them into one row per player at load
+time so thresholds such as min_goals apply to the season total. Counts are
+summed, ratios with known components (Cmp% = Cmp / Att, ...) are recomputed
+from the summed counts, other rates and percentages are minute-weighted means
+of the stints, and descriptive columns come from the stint with the most
+minutes. The stints stay reachable from each player row.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from soccer_delta import assign_rows
+from soccer_schema import STATS_SUFFIX
+
+# Ratio -> (numerator, denominator columns, scale), recomputed from summed counts
+RATIO_COLUMNS = {
+    'Cmp%': ('Cmp', ['Att'], 100),
+    'SoT%': ('SoT', ['Sh'], 100),
+    'npxG/Sh': ('npxG', ['Sh'], 1),
+    'Succ%': ('Succ', ['Att_stats_possession'], 100),
+    'Tkld%': ('Tkld', ['Att_stats_possession'], 100),
+    'Won%': ('Won', ['Won', 'Lost_stats_misc'], 100),
+    'Stp%': ('Stp', ['Opp'], 100),
+    'Cmp%_stats_keeper_adv': ('Cmp_stats_keeper_adv', ['Att_stats_keeper_adv'], 100),
+}
+# Rates and averages that are not sums: per-90 figures, percentages, per-shot/per-match values
+RATE_PATTERN = re.compile(r'%|/90|90$|/Sh|/SoT|/MP|/Start|/Sub')
+RATE_COLUMNS = {'Dist', 'AvgLen', 'AvgDist', 'PPM', 'On-Off'}
+# Numeric columns describing the player rather than counting events
+PRIMARY_COLUMNS = {'Rk', 'Age', 'Born'}
+
+
+def player_keys(data):
+    """ Columns identifying a player: name plus birth year when available (separates namesakes) """
+    return [col for col in ('Player', 'Born') if col in data.columns]
+
+
+def column_kind(name, dtype):
+    """ How a column combines across stints: 'primary', 'ratio', 'rate' or 'sum' """
+    match = STATS_SUFFIX.match(name)
+    base = match.group(1) if match else name
+    if not pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype) or base in PRIMARY_COLUMNS:
+        return 'primary'
+    if name in RATIO_COLUMNS:
+        return 'ratio'
+    if RATE_PATTERN.search(base) or base in RATE_COLUMNS:
+        return 'rate'
+    return 'sum'
+
+
+class PlayerRollup:
+    """ One row per player with season totals; stints(i) gives the stint rows of player row i
+
+    table has the input columns plus Stints (number of clubs) and, when Squad
+    is loaded, Squads (every club, primary first). stint_rows lists the input
+    row positions grouped by player, primary stint first, and offsets[i]:offsets[i + 1]
+    is player i's slice of it; player_of maps an input row back to its player row.
+    """
+
+    def __init__(self, data):
+        keys = player_keys(data)
+        minutes = data['Min'].to_numpy(dtype=np.float64, na_value=0) if 'Min' in data.columns else np.zeros(len(data))
+        # Player number in order of first appearance; within a player, most minutes first
+        codes = data.groupby(keys, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+        self.stint_rows = np.lexsort((-minutes, codes))
+        sorted_codes = codes[self.stint_rows]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(data) else np.empty(0, int)
+        self.offsets = np.r_[starts, len(data)]
+        self.player_of = np.empty(len(data), dtype=np.intp)
+        self.player_of[self.stint_rows] = sorted_codes
+        self.table = self._combine(data.iloc[self.stint_rows].reset_index(drop=True),
+                                   sorted_codes, starts, minutes[self.stint_rows])
+
+    def _combine(self, stints, codes, starts, minutes):
+        primary = stints.iloc[starts].reset_index(drop=True)
+        counts = np.diff(self.offsets)
+        kinds = {name: column_kind(name, stints[name].dtype) for name in stints.columns}
+        # One grouped pass for all count columns and one for all rates
+        sums = [name for name, kind in kinds.items() if kind == 'sum']
+        summed = stints[sums].groupby(codes).sum(min_count=1).reset_index(drop=True)
+        rates = [name for name, kind in kinds.items() if kind in ('rate', 'ratio')]
+        values = stints[rates].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(values)
+        weights = np.where(present, minutes[:, None], 0.0)
+        # Ratios start as minute-weighted means and are recomputed below when their counts are loaded
+        weighted = pd.DataFrame(np.where(present, values * minutes[:, None], 0.0)).groupby(codes).sum().to_numpy()
+        total_weight = pd.DataFrame(weights).groupby(codes).sum().to_numpy()
+        # Players without minutes fall back to the plain mean of their stints
+        means = pd.DataFrame(values).groupby(codes).mean().to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            averaged = np.where(total_weight > 0, weighted / total_weight, means)
+        rate_position = {name: j for j, name in enumerate(rates)}
+        columns = {}
+        for name, kind in kinds.items():
+            if kind == 'primary':
+                columns[name] = primary[name]
+            elif kind == 'sum':
+                columns[name] = summed[name]
+            else:
+                columns[name] = pd.Series(averaged[:, rate_position[name]])
+        # Single-stint players keep the published ratio; multi-stint ones get it from their totals
+        multi = pd.Series(counts > 1)
+        for name, (numerator, denominators, scale) in RATIO_COLUMNS.items():
+            needed = [numerator] + denominators
+            if name in columns and all(col in columns for col in needed):
+                total = sum(columns[col].astype(np.float64) for col in denominators)
+                ratio = columns[numerator] / total.where(total > 0) * scale
+                columns[name] = columns[name].where(~multi, ratio)
+        columns['Stints'] = pd.Series(counts)
+        if 'Squad' in stints.columns:
+            names = stints['Squad'].astype(str).to_numpy(dtype=object)
+            squads = names[starts].copy()
+            # Only players with several clubs need joining; stints are already grouped by player
+            for i in np.flatnonzero(counts > 1):
+                squads[i] = ', '.join(names[self.offsets[i]:self.offsets[i + 1]])
+            columns['Squads'] = pd.Series(squads, dtype=str)
+        return pd.DataFrame(columns)
+
+    def refresh(self, data, rows, columns=None):
+        """ Recompute the player rows holding input rows whose values changed
+
+        data is the updated input table with the same rows as before (new rows
+        or changed player keys need a fresh PlayerRollup). columns, the input
+        columns that changed, limits the work unless it includes Min, which
+        reorders stints (so can change a player's primary Squad, Comp and
+        Pos) and reweights every rate. Returns (player rows, table columns
+        rewritten for them).
+        """
+        players = np.unique(self.player_of[rows])
+        positions = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in players])
+        stints = self.stint_rows[positions]
+        affected = None
+        if columns is not None and 'Min' not in columns:
+            columns = set(columns)
+            ratios = {name for name, (numerator, denominators, _) in RATIO_COLUMNS.items()
+                      if columns & {numerator, *denominators}}
+            affected = [col for col in data.columns if col in columns or col in ratios]
+            needed = set(affected) | set(player_keys(data)) | {'Min'}
+            for name in ratios:
+                needed.update([RATIO_COLUMNS[name][0], *RATIO_COLUMNS[name][1]])
+            data = data[[col for col in data.columns if col in needed]]
+        # The stints are grouped by player in the order of players, so the sub-rollup's rows line up with them
+        sub = PlayerRollup(data.iloc[stints])
+        self.stint_rows = self.stint_rows.copy()
+        self.stint_rows[positions] = stints[sub.stint_rows]
+        written = sub.table if affected is None else sub.table[affected]
+        self.table = assign_rows(self.table, players, written)
+        return players, list(written.columns)
+
+    @classmethod
+    def from_parts(cls, table, stint_rows, offsets, player_of):
+        """ Rollup from the table and row arrays of one built earlier (see soccer_shm) """
+        rollup = cls.__new__(cls)
+        rollup.table, rollup.stint_rows, rollup.offsets, rollup.player_of = table, stint_rows, offsets, player_of
+        return rollup
+
+    def __len__(self):
+        return len(self.table)
+
+    def stints(self, i):
+        """ Input row positions of player row i, primary stint first """
+        return self.stint_rows[self.offsets[i]:self.offsets[i + 1]]
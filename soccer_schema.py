@@ -0,0 +1,130 @@
+"""
+soccer_schema.py
+
+Ingestion stage that narrows the wide FBref join. The full CSV repeats join
+columns for every stat table (Rk_stats_*, Nation_stats_*, Pos_stats_*, ...)
+and carries a few stats twice (Gls_stats_shooting, xG_stats_shooting, ...).
+find_redundant() detects those copies and checks that they agree with the
+column they duplicate; write_light() drops them and writes the narrow
+"light" CSV plus a JSON column manifest, rebuilding both whenever the source
+CSV changes.
+
+    python soccer_schema.py players_data-2024_2025.csv
+"""
+import json
+import os
+import re
+import sys
+
+import pandas as pd
+
+from soccer_store import file_signature
+
+# Columns every FBref stat table repeats to join on the player row
+JOIN_COLUMNS = ['Rk', 'Nation', 'Pos', 'Comp', 'Age', 'Born', '90s', 'MP', 'Starts', 'Min']
+STATS_SUFFIX = re.compile(r'^(.+)_stats_(\w+)$')
+
+
+def source_table(column):
+    """ FBref table a column came from ('standard' for the unsuffixed ones) """
+    match = STATS_SUFFIX.match(column)
+    return match.group(2) if match else 'standard'
+
+
+def light_filename(filename):
+    """ players_data-2024_2025.csv -> players_data_light-2024_2025.csv """
+    directory, base = os.path.split(filename)
+    stem, ext = os.path.splitext(base)
+    name, dash, season = stem.partition('-')
+    return os.path.join(directory, f'{name}_light{dash}{season}{ext}')
+
+
+def manifest_filename(light_file):
+    """ Column manifest written next to a light CSV """
+    return os.path.splitext(light_file)[0] + '.manifest.json'
+
+
+def find_redundant(df):
+    """ Find columns that repeat information held by another column
+
+    Returns (dropped, conflicts). dropped maps each redundant column to
+    (kept column, reason): 'identical' when the values match exactly, or
+    'join copy' when an X_stats_* copy of a join column agrees with X wherever
+    the copy has a value (keeper tables only fill goalkeeper rows). conflicts
+    lists join copies that disagree with their base column, which are kept.
+    """
+    dropped = {}
+    by_hash = {}
+    for name in df.columns:
+        digest = pd.util.hash_pandas_object(df[name], index=False).to_numpy().tobytes()
+        for other in by_hash.get(digest, []):
+            if df[other].equals(df[name]):
+                dropped[name] = (other, 'identical')
+                break
+        else:
+            by_hash.setdefault(digest, []).append(name)
+
+    conflicts = []
+    for name in df.columns:
+        match = STATS_SUFFIX.match(name)
+        if name in dropped or match is None:
+            continue
+        base = match.group(1)
+        if base not in JOIN_COLUMNS or base not in df.columns:
+            continue
+        present = df[name].notna()
+        if (df[base][present] == df[name][present]).all():
+            dropped[name] = (base, 'join copy')
+        else:
+            conflicts.append(name)
+    return dropped, conflicts
+
+
+def normalize_table(df):
+    """ Drop redundant columns and describe the result; returns (narrow DataFrame, manifest) """
+    dropped, conflicts = find_redundant(df)
+    narrow = df[[name for name in df.columns if name not in dropped]]
+    manifest = {
+        'columns': [{'name': name, 'dtype': str(narrow[name].dtype), 'table': source_table(name),
+                     'nulls': int(narrow[name].isna().sum())} for name in narrow.columns],
+        'dropped': [{'name': name, 'duplicate_of': kept, 'reason': reason}
+                    for name, (kept, reason) in dropped.items()],
+        'conflicts': conflicts,
+    }
+    return narrow, manifest
+
+
+def write_light(filename, light_file=None):
+    """ Write the narrow CSV and its manifest for filename unless they are already current
+
+    Returns the path of the light CSV.
+    """
+    light_file = light_file or light_filename(filename)
+    manifest_file = manifest_filename(light_file)
+    signature = file_signature(filename)
+    try:
+        with open(manifest_file, encoding='utf-8') as f:
+            current = json.load(f)
+        if current.get('source', {}).get('sha256') == signature['sha256'] and os.path.exists(light_file):
+            return light_file
+    except (OSError, ValueError):
+        pass
+
+    df = pd.read_csv(filename)
+    narrow, manifest = normalize_table(df)
+    narrow.to_csv(light_file, index=False)
+    manifest = {'source': {'file': os.path.basename(filename), **signature},
+                'rows': len(narrow), 'source_columns': len(df.columns), **manifest}
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+    return light_file
+
+
+if __name__ == '__main__':
+    for path in sys.argv[1:] or ['players_data-2024_2025.csv']:
+        out = write_light(path)
+        with open(manifest_filename(out), encoding='utf-8') as f:
+            summary = json.load(f)
+        print(f"✅ {path}: {summary['source_columns']} -> {len(summary['columns'])} columns written to {out}")
+        if summary['conflicts']:
+            print(f"   Kept join copies that disagree with their base column: {', '.join(summary['conflicts'])}")
@@ -0,0 +1,138 @@
+"""
+soccer_seasons.py
+
+Streaming access to many season files (players_data-2023_2024.csv,
+players_data-2024_2025.csv, ...). Files are read in fixed-size chunks and each
+row is tagged with its season, so filters and aggregates over the union of
+seasons never hold more than one chunk plus the result in memory. A season
+filter skips the other files without opening them.
+"""
+import glob
+import os
+import re
+
+import pandas as pd
+
+from soccer_store import read_csv_chunks
+
+SEASON_PATTERN = re.compile(r'(\d{4})[_-](\d{4})')
+DEFAULT_CHUNKSIZE = 20000
+
+
+def season_of(filename):
+    """ Season label ('2024-2025') taken from a file name like players_data-2024_2025.csv """
+    match = SEASON_PATTERN.search(os.path.basename(filename))
+    if match is None:
+        raise ValueError(f"No season (YYYY_YYYY) in file name {filename!r}")
+    return f'{match.group(1)}-{match.group(2)}'
+
+
+def filter_mask(df, min_goals=10, min_assists=0, comp=None, squad=None, age_range=None, min_minutes=0):
+    """ Boolean mask with the same semantics as SOCCERAPI.get_data """
+    mask = (df['Gls'] >= min_goals) & (df['Ast'] >= min_assists) & (df['Min'] >= min_minutes)
+    if comp is not None:
+        mask &= df['Comp'].isin(comp if isinstance(comp, list) else [comp])
+    if squad is not None:
+        mask &= df['Squad'].isin(squad if isinstance(squad, list) else [squad])
+    if age_range is not None:
+        mask &= (df['Age'] >= age_range[0]) & (df['Age'] <= age_range[1])
+    return mask
+
+
+class SeasonCatalog:
+    """ A set of season files queried chunk by chunk """
+
+    def __init__(self, files, columns=None, chunksize=DEFAULT_CHUNKSIZE, cache=True):
+        """ files is a glob pattern or a list of paths; columns limits what is read """
+        paths = sorted(glob.glob(files)) if isinstance(files, str) else list(files)
+        if not paths:
+            raise FileNotFoundError(f"No season files match {files!r}")
+        self.files = {season_of(path): path for path in paths}
+        self.columns = columns
+        self.chunksize = chunksize
+        self.cache = cache
+
+    def seasons(self):
+        """ Sorted season labels """
+        return sorted(self.files)
+
+    def _select(self, season):
+        if season is None:
+            return self.seasons()
+        wanted = season if isinstance(season, list) else [season]
+        return [label for label in self.seasons() if label in wanted]
+
+    def iter_chunks(self, season=None, columns=None):
+        """ Yield DataFrame chunks with a Season column, reading only the selected season files
+
+        With the columnar cache each file is memory-mapped and sliced before
+        decoding, so only the current chunk is converted and resident;
+        otherwise the CSV is parsed chunksize rows at a time.
+        """
+        columns = columns or self.columns
+        for label in self._select(season):
+            path = self.files[label]
+            if self.cache:
+                chunks = read_csv_chunks(path, columns, compact=True, chunksize=self.chunksize)
+            else:
+                chunks = pd.read_csv(path, usecols=columns, chunksize=self.chunksize)
+            for chunk in chunks:
+                season_col = pd.Series(label, index=chunk.index, name='Season')
+                yield pd.concat([chunk, season_col], axis=1)
+
+    def get_data(self, season=None, **filters):
+        """ Rows of the selected seasons that pass the get_data filters """
+        parts = [chunk[filter_mask(chunk, **filters)] for chunk in self.iter_chunks(season)]
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return next(self.iter_chunks(season), pd.DataFrame()).iloc[:0]
+        # Categories can differ between files, so let concat fall back to plain values
+        return pd.concat(parts, ignore_index=True)
+
+    def aggregate(self, by, stats, season=None, **filters):
+        """ Per-group sums of stats plus a row count, combined chunk by chunk
+
+        Only the running per-group totals are kept between chunks. filters
+        are the get_data keyword arguments, except that min_goals defaults to 0
+        so every row is counted unless asked otherwise.
+        """
+        filters.setdefault('min_goals', 0)
+        by = [by] if isinstance(by, str) else list(by)
+        columns = None if self.columns is None else list(dict.fromkeys(self.columns + [c for c in by + stats if c != 'Season']))
+        totals = None
+        for chunk in self.iter_chunks(season, columns):
+            chunk = chunk[filter_mask(chunk, **filters)]
+            grouped = chunk.groupby(by, observed=True)
+            partial = grouped[stats].sum().assign(count=grouped.size())
+            if totals is not None:
+                partial = pd.concat([totals, partial]).groupby(level=list(range(len(by))), observed=True).sum()
+            totals = partial
+        if totals is None:
+            return pd.DataFrame(columns=stats + ['count'])
+        return totals.sort_index()
+
+    def unique_values(self, column, season=None):
+        """ Sorted distinct non-null values of a column across the selected seasons """
+        values = set()
+        for chunk in self.iter_chunks(season, [column]):
+            values.update(chunk[column].dropna().unique())
+        return sorted(values)
+
+    def column_range(self, column, season=None):
+        """ (min, max) of a column across the selected seasons """
+        lo = hi = None
+        for chunk in self.iter_chunks(season, [column]):
+            col = chunk[column]
+            if col.notna().any():
+                lo = col.min() if lo is None else min(lo, col.min())
+                hi = col.max() if hi is None else max(hi, col.max())
+        return int(lo), int(hi)
+
+    def squads_by_competition(self, comp_values, season=None):
+        """ Sorted squads playing in the given competitions (all squads if none given) """
+        squads = set()
+        for chunk in self.iter_chunks(season, ['Comp', 'Squad']):
+            if comp_values:
+                chunk = chunk[chunk['Comp'].isin(comp_values)]
+            squads.update(chunk['Squad'].dropna().unique())
+        return sorted(squads)
@@ -0,0 +1,296 @@
+"""
+soccer_server.py
+
+Long-running JSON query server around SOCCERAPI. The dataset is loaded once
+and queries run concurrently on a thread pool behind a small asyncio HTTP/1.1
+server (standard library only).
+
+    python soccer_server.py players_data-2024_2025.csv --port 8050
+
+    GET  /api/get_data?min_goals=5&comp=es La Liga&comp=it Serie A&age_range=18,30&fields=Player,Gls
+    GET  /api/get_unique_values?column=Comp
+    GET  /api/get_column_range?column=Min
+    GET  /api/get_squads_by_competition?comp_values=es La Liga
+    GET  /api/get_player_rows?player_name=Max Aarons
+    GET  /api/get_player_positions?player_names=Max Aarons&player_names=Erling Haaland
+    GET  /api/get_player_totals?player_names=Max Aarons
+    GET  /api/similar_players?player_names=Erling Haaland&k=10&comp=es La Liga
+    GET  /api/summarize?by=Comp,AgeBand&stats=Gls,Min,xG&Comp=es La Liga
+    GET  /api/get_derived?metrics=Gls/90,npxG/90,Gls-xG&level=player
+    POST /api/batch   {"queries": [{"method": "get_data", "params": {"min_goals": 5}, "fields": ["Player"]}, ...]}
+    POST /api/reload  (reload the CSV in the background; queries keep using the old version until it is ready)
+    GET  /metrics     (with --profile: call timings and cache counters in the Prometheus text format)
+
+DataFrames are returned column-oriented ({"columns": [...], "data": [[...], ...]}
+with one list per column), optionally restricted with fields=, and responses are gzip-compressed when the client
+accepts it. Identical queries that arrive while one is already running share
+its result. Each query reads one consistent version of the data, even while a
+reload replaces it.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from soccer_api import SOCCERAPI
+
+MAX_BODY_BYTES = 1024 * 1024
+GZIP_MIN_BYTES = 1024
+
+
+class BadRequest(Exception):
+    """ Client error reported as HTTP 400 """
+
+
+class NotFound(Exception):
+    """ Unknown route, reported as HTTP 404 """
+
+
+def _number(value):
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def _scalar_or_list(values):
+    return values if len(values) > 1 else values[0]
+
+
+def _range(values):
+    lo, hi = str(values[-1]).split(',')
+    return _number(lo), _number(hi)
+
+
+def _names(values):
+    return [name for value in values for name in str(value).split(',')]
+
+
+# Query-string converters for each method's parameters (values arrive as lists)
+QUERY_PARAMS = {
+    'get_data': {'min_goals': lambda v: _number(v[-1]), 'min_assists': lambda v: _number(v[-1]),
+                 'comp': _scalar_or_list, 'squad': _scalar_or_list, 'age_range': _range,
+                 'min_minutes': lambda v: _number(v[-1]), 'season': _scalar_or_list, 'level': lambda v: v[-1]},
+    'get_unique_values': {'column': lambda v: v[-1], 'season': _scalar_or_list},
+    'get_column_range': {'column': lambda v: v[-1], 'season': _scalar_or_list},
+    'get_squads_by_competition': {'comp_values': list, 'season': _scalar_or_list},
+    'get_player_rows': {'player_name': lambda v: v[-1]},
+    'get_player_positions': {'player_names': list},
+    'get_player_squads': {'player_names': list},
+    'get_player_totals': {'player_names': list},
+    'similar_players': {'player_names': list, 'group': lambda v: v[-1], 'k': lambda v: int(v[-1]),
+                        'metric': lambda v: v[-1], 'level': lambda v: v[-1], 'min_goals': lambda v: _number(v[-1]),
+                        'min_assists': lambda v: _number(v[-1]), 'comp': _scalar_or_list, 'squad': _scalar_or_list,
+                        'age_range': _range, 'min_minutes': lambda v: _number(v[-1])},
+    'get_player_stats': {'player_names': list, 'columns': _names},
+    'summarize': {'by': _names, 'stats': _names, 'Comp': _scalar_or_list, 'Squad': _scalar_or_list,
+                  'Pos': _scalar_or_list, 'AgeBand': _scalar_or_list},
+    'get_derived': {'metrics': _names, 'level': lambda v: v[-1]},
+}
+
+
+def encode_result(result, fields=None):
+    """ JSON-ready version of a SOCCERAPI result; DataFrames become column lists """
+    if isinstance(result, pd.DataFrame):
+        # Named index levels (group keys of summaries) are returned as columns
+        if any(name is not None for name in result.index.names):
+            result = result.reset_index()
+        if fields:
+            result = result[[col for col in fields if col in result.columns]]
+        data = []
+        for name in result.columns:
+            col = result[name]
+            if pd.api.types.is_float_dtype(col.dtype):
+                values = col.to_numpy(dtype=np.float64)
+                data.append([None if v != v else v for v in values.tolist()])
+            else:
+                data.append(col.to_numpy(dtype=object, na_value=None).tolist())
+        return {'columns': [str(name) for name in result.columns], 'data': data}
+    if isinstance(result, dict):
+        return {str(key): encode_result(value) for key, value in result.items()}
+    if isinstance(result, (list, tuple)):
+        return [encode_result(value) for value in result]
+    if isinstance(result, np.generic):
+        return result.item()
+    if isinstance(result, float) and result != result:
+        return None
+    return result
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class QueryServer:
+    """ Serves SOCCERAPI methods as JSON over HTTP """
+
+    def __init__(self, api, workers=4):
+        self.api = api
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.in_flight = {}
+
+    def run_query(self, method, params, fields=None):
+        """ Run one API call on the thread pool, sharing the result of identical in-flight calls """
+        if method not in QUERY_PARAMS:
+            raise BadRequest(f"Unknown method {method!r}")
+        key = (method, _freeze(params), _freeze(fields))
+        future = self.in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            call = lambda: encode_result(getattr(self.api, method)(**params), fields)
+            future = asyncio.ensure_future(loop.run_in_executor(self.executor, call))
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return future
+
+    async def run_batch(self, queries):
+        """ Run a list of {"method", "params", "fields"} queries concurrently """
+        if not isinstance(queries, list):
+            raise BadRequest('"queries" must be a list')
+
+        async def run_one(query):
+            try:
+                if not isinstance(query, dict):
+                    raise BadRequest('Each query must be an object with "method", "params" and "fields"')
+                params = dict(query.get('params', {}))
+                if isinstance(params.get('age_range'), list):
+                    params['age_range'] = tuple(params['age_range'])
+                return await self.run_query(query.get('method'), params, query.get('fields'))
+            except Exception as e:
+                return {'error': str(e)}
+
+        return await asyncio.gather(*(run_one(query) for query in queries))
+
+    async def dispatch(self, method, path, query, body):
+        """ Route one request and return the JSON-ready response (or text, for /metrics) """
+        if path == '/metrics':
+            if self.api.profiler is None:
+                raise NotFound(path)
+            return self.api.profiler.prometheus(self.api.cache_stats())
+        parts = path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'api':
+            raise NotFound(path)
+        name = parts[1]
+        if name == 'batch':
+            if method != 'POST':
+                raise BadRequest('/api/batch expects POST')
+            try:
+                payload = json.loads(body or b'{}')
+            except ValueError as e:
+                raise BadRequest(f'Invalid JSON body: {e}')
+            if not isinstance(payload, dict):
+                raise BadRequest('/api/batch expects a JSON object {"queries": [...]}')
+            return await self.run_batch(payload.get('queries'))
+        if name == 'reload':
+            if method != 'POST':
+                raise BadRequest('/api/reload expects POST')
+            return {'version': await asyncio.wrap_future(self.api.reload())}
+        if name not in QUERY_PARAMS:
+            raise NotFound(path)
+        args = parse_qs(query, keep_blank_values=True)
+        fields = _names(args.pop('fields')) if 'fields' in args else None
+        converters = QUERY_PARAMS[name]
+        unknown = set(args) - set(converters)
+        if unknown:
+            raise BadRequest(f"Unknown parameters for {name}: {sorted(unknown)}")
+        try:
+            params = {key: converters[key](values) for key, values in args.items()}
+        except ValueError as e:
+            raise BadRequest(str(e))
+        return await self.run_query(name, params, fields)
+
+    async def handle(self, reader, writer):
+        """ Serve HTTP/1.1 requests on one connection (keep-alive supported) """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get('content-length') or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    # The body cannot be delimited, so the connection is closed after the reply
+                    await self.respond(writer, 400, {'error': 'Invalid Content-Length'}, headers)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, 413, {'error': 'Request body too large'}, headers)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                url = urlsplit(target)
+                try:
+                    status, payload = 200, await self.dispatch(method, url.path, url.query, body)
+                except NotFound:
+                    status, payload = 404, {'error': f'No endpoint {url.path}'}
+                except (BadRequest, LookupError, TypeError, ValueError) as e:
+                    status, payload = 400, {'error': str(e)}
+                except Exception as e:
+                    status, payload = 500, {'error': str(e)}
+                await self.respond(writer, status, payload, headers)
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, request_headers):
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            headers = {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8', 'Access-Control-Allow-Origin': '*'}
+        else:
+            body = json.dumps(payload, separators=(',', ':'), allow_nan=False, ensure_ascii=False).encode('utf-8')
+            headers = {'Content-Type': 'application/json; charset=utf-8', 'Access-Control-Allow-Origin': '*'}
+        if len(body) >= GZIP_MIN_BYTES and 'gzip' in request_headers.get('accept-encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        headers['Content-Length'] = str(len(body))
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+                  500: 'Internal Server Error'}[status]
+        head = f'HTTP/1.1 {status} {reason}\r\n' + ''.join(f'{k}: {v}\r\n' for k, v in headers.items()) + '\r\n'
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8050):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve SOCCERAPI queries as JSON over HTTP')
+    parser.add_argument('filename', nargs='?', default='players_data-2024_2025.csv')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--profile', action='store_true', help='record query timings and serve them at /metrics')
+    args = parser.parse_args()
+
+    api = SOCCERAPI(args.filename, profile=args.profile or None)
+    print(f"✅ Loaded {len(api.data)} rows from {args.filename}")
+    print(f"   Serving on http://{args.host}:{args.port}/api/")
+    asyncio.run(QueryServer(api, args.workers).serve(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
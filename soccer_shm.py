@@ -0,0 +1,200 @@
+"""
+soccer_shm.py
+
+Player tables shared between processes. SharedDataset writes the typed
+columns of the loaded table (and of the per-player rollup) into one named
+shared-memory segment, with text columns dictionary-encoded as in
+soccer_store, plus a small JSON manifest segment. SharedTables maps them
+back in another process as read-only DataFrames whose columns are views of
+the shared buffer, so N workers hold one copy of the data and never parse
+the CSV. SOCCERAPI.share() and SOCCERAPI.attach() wrap these.
+
+    with api.share() as shared:                    # loader
+        pool.map(work, [shared.name] * 8)
+
+    def work(name):                                # worker process
+        api = SOCCERAPI.attach(name)
+        ...
+        api.close()
+
+Text columns come back as pandas categories. The publisher owns the
+segments: they are unlinked by SharedDataset.unlink(), on leaving the with
+block, or when the publishing process exits.
+"""
+import json
+import secrets
+import sys
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+SHM_PREFIX = 'soccer'
+FORMAT_VERSION = 1
+# Column offsets are aligned for vectorized reads
+ALIGNMENT = 64
+# PlayerRollup arrays shared next to its table
+ROLLUP_ARRAYS = ('stint_rows', 'offsets', 'player_of')
+
+
+class _Segment(shared_memory.SharedMemory):
+    """ SharedMemory that, when collected while arrays still view it, leaves the mapping to them """
+
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+
+def _open(name):
+    """ Attach to an existing segment without letting this process's resource tracker unlink it at exit
+
+    Before Python 3.13 every process that opens a segment registers it with
+    the tracker, which removes it when that process exits, from under the
+    publisher and the other workers.
+    """
+    if sys.version_info >= (3, 13):
+        return _Segment(name, track=False)
+    segment = _Segment(name)
+    resource_tracker.unregister(segment._name, 'shared_memory')
+    return segment
+
+
+def _encode(values):
+    """ (manifest entry, numpy array) for one column: numbers as they are, anything else as category codes """
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biuf':
+        return {'kind': 'numeric'}, values.to_numpy()
+    if pd.api.types.is_numeric_dtype(values.dtype) and not isinstance(values.dtype, pd.CategoricalDtype):
+        # Nullable extension integers and floats
+        return {'kind': 'numeric'}, values.to_numpy(dtype=np.float64, na_value=np.nan)
+    categorical = values.astype('category')
+    entry = {'kind': 'category', 'categories': categorical.cat.categories.tolist(),
+             'ordered': bool(categorical.cat.ordered)}
+    return entry, categorical.array.codes
+
+
+def _decode(entry, array):
+    if entry['kind'] == 'numeric':
+        return array
+    dtype = pd.CategoricalDtype(entry['categories'], ordered=entry['ordered'])
+    # validate=False keeps the codes as a view of the shared buffer
+    return pd.Categorical.from_codes(array, dtype=dtype, validate=False)
+
+
+class SharedDataset:
+    """ Publisher of a table (and optionally its PlayerRollup) in shared memory
+
+    name defaults to a random 'soccer_...' name; pass it to SharedTables or
+    SOCCERAPI.attach in the workers.
+    """
+
+    def __init__(self, data, rollup=None, name=None):
+        self.name = name or f'{SHM_PREFIX}_{secrets.token_hex(6)}'
+        layout, arrays, size = {'tables': {}, 'arrays': {}}, [], 0
+
+        def place(entry, array):
+            nonlocal size
+            size = -(-size // ALIGNMENT) * ALIGNMENT
+            entry.update({'dtype': array.dtype.str, 'offset': size, 'length': len(array)})
+            arrays.append((entry['offset'], np.ascontiguousarray(array)))
+            size += array.nbytes
+            return entry
+
+        tables = {'stint': data} if rollup is None else {'stint': data, 'player': rollup.table}
+        for level, table in tables.items():
+            columns = []
+            for col in table.columns:
+                entry, array = _encode(table[col])
+                columns.append(place({'name': col, **entry}, array))
+            layout['tables'][level] = {'rows': len(table), 'columns': columns}
+        if rollup is not None:
+            for attribute in ROLLUP_ARRAYS:
+                layout['arrays'][attribute] = place({}, getattr(rollup, attribute))
+
+        self.segments = [shared_memory.SharedMemory(f'{self.name}_data', create=True, size=max(size, 1))]
+        try:
+            for offset, array in arrays:
+                np.frombuffer(self.segments[0].buf, array.dtype, len(array), offset)[:] = array
+            manifest = json.dumps({'format': FORMAT_VERSION, **layout}).encode('utf-8')
+            self.segments.append(shared_memory.SharedMemory(self.name, create=True, size=len(manifest)))
+            self.segments[1].buf[:len(manifest)] = manifest
+        except BaseException:
+            _unlink(self.segments)
+            raise
+        self.nbytes = size
+        # Unlinked at exit at the latest, even if unlink() is never called
+        self.finalizer = weakref.finalize(self, _unlink, self.segments)
+
+    def unlink(self):
+        """ Remove the segments; attached processes keep their mappings until they close them """
+        self.finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.unlink()
+
+    def __repr__(self):
+        return f"<SharedDataset {self.name!r} {self.nbytes / 1e6:.1f} MB>"
+
+
+def _unlink(segments):
+    for segment in segments:
+        segment.close()
+        if sys.version_info < (3, 13):
+            # Workers sharing this process's resource tracker unregistered the name when they attached
+            resource_tracker.register(segment._name, 'shared_memory')
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedTables:
+    """ Read-only views of the tables published under name
+
+    data is the stint table and player the rollup table (None if no rollup
+    was published); rollup_arrays holds the PlayerRollup arrays. close()
+    releases the mapping once nothing uses the tables any more.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        manifest_segment = _open(name)
+        try:
+            manifest = json.loads(bytes(manifest_segment.buf).rstrip(b'\0').decode('utf-8'))
+        finally:
+            manifest_segment.close()
+        if manifest.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Shared dataset {name!r} has format {manifest.get('format')}, expected {FORMAT_VERSION}")
+        self.segment = _open(f'{name}_data')
+
+        def view(entry):
+            array = np.frombuffer(self.segment.buf, np.dtype(entry['dtype']), entry['length'], entry['offset'])
+            array.flags.writeable = False
+            return array
+
+        self.tables = {}
+        for level, table in manifest['tables'].items():
+            columns = {entry['name']: _decode(entry, view(entry)) for entry in table['columns']}
+            self.tables[level] = pd.DataFrame(columns, index=pd.RangeIndex(table['rows']), copy=False)
+        self.rollup_arrays = {attribute: view(entry) for attribute, entry in manifest['arrays'].items()}
+
+    @property
+    def data(self):
+        return self.tables['stint']
+
+    @property
+    def player(self):
+        return self.tables.get('player')
+
+    def close(self):
+        """ Unmap the segment; raises BufferError while DataFrames built on it are still referenced """
+        self.tables, self.rollup_arrays = {}, {}
+        self.segment.close()
+
+    def __repr__(self):
+        return f"<SharedTables {self.name!r} {list(self.tables)}>"
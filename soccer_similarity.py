@@ -0,0 +1,149 @@
+"""
+soccer_similarity.py
+
+Nearest-neighbour search over player stat vectors. SimilarityIndex turns one
+stat group (see soccer_normalize.STAT_GROUPS) into a standardized per-90
+feature matrix once; queries are then matrix products plus an argpartition
+top-k, answered for many players at a time. Large pools (several seasons)
+get an inverted-file index: rows are bucketed by their nearest k-means
+centroid and a query only scores the buckets closest to it.
+"""
+import numpy as np
+
+from soccer_rollup import column_kind
+
+METRICS = ('cosine', 'euclidean')
+# Pools at least this big are searched through the inverted-file index
+IVF_MIN_ROWS = 20000
+
+
+def feature_matrix(data, cols):
+    """ Per-90 rates for count columns, raw values for rates and percentages, as float64 """
+    minutes = data['Min'].to_numpy(dtype=np.float64, na_value=np.nan)
+    features = np.empty((len(data), len(cols)))
+    for j, col in enumerate(cols):
+        values = data[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        if column_kind(col, data[col].dtype) == 'sum':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = values / (minutes / 90)
+        features[:, j] = values
+    features[~np.isfinite(features)] = np.nan
+    return features
+
+
+def _centroid_distances(points, centroids):
+    """ Squared distances from points to centroids, up to a per-point constant """
+    return (centroids ** 2).sum(axis=1)[None, :] - 2 * points @ centroids.T
+
+
+def _top_k(scores, k):
+    """ Column positions of the k highest scores in each row, best first """
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((len(scores), 0), dtype=np.intp)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1)
+
+
+class SimilarityIndex:
+    """ Top-k similar rows of data over the given stat columns
+
+    The pool of candidates is every row with at least min_minutes minutes (rates
+    of players with fewer minutes are too noisy to compare). Features are
+    z-scored against the pool; missing values count as the pool average.
+    """
+
+    def __init__(self, data, cols, min_minutes=450, ivf_min_rows=IVF_MIN_ROWS):
+        self.cols = list(cols)
+        raw = feature_matrix(data, self.cols)
+        minutes = data['Min'].to_numpy(dtype=np.float64, na_value=0)
+        self.pool = np.flatnonzero(minutes >= min_minutes)
+        mean = np.nanmean(raw[self.pool], axis=0) if len(self.pool) else np.zeros(len(self.cols))
+        std = np.nanstd(raw[self.pool], axis=0) if len(self.pool) else np.ones(len(self.cols))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features = np.where(std > 0, (raw - mean) / std, 0.0)
+        features = np.nan_to_num(features, nan=0.0)
+        self.features = features.astype(np.float32)
+        norms = np.linalg.norm(self.features, axis=1, keepdims=True)
+        self.unit = np.divide(self.features, norms, out=np.zeros_like(self.features), where=norms > 0)
+        self.sq_norms = (self.features ** 2).sum(axis=1)
+        self.ivf_min_rows = ivf_min_rows
+        self.ivf = {}
+
+    def _space(self, metric):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+        return self.unit if metric == 'cosine' else self.features
+
+    def _scores(self, metric, queries, rows):
+        """ Higher-is-better scores of queries (row ids) against rows: cosine or negative squared distance """
+        space = self._space(metric)
+        dots = space[queries] @ space[rows].T
+        if metric == 'cosine':
+            return dots
+        return 2 * dots - self.sq_norms[queries, None] - self.sq_norms[None, rows]
+
+    def _build_ivf(self, metric, seed=0, iterations=8):
+        """ k-means buckets over the pool: (centroids, offsets, rows sorted by bucket) """
+        space = self._space(metric)[self.pool]
+        n_lists = max(1, int(np.sqrt(len(space))))
+        rng = np.random.default_rng(seed)
+        centroids = space[rng.choice(len(space), n_lists, replace=False)]
+        sample = space[rng.choice(len(space), min(len(space), 50 * n_lists), replace=False)]
+        for _ in range(iterations):
+            assign = _centroid_distances(sample, centroids).argmin(axis=1)
+            for c in range(n_lists):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+        assign = _centroid_distances(space, centroids).argmin(axis=1)
+        order = np.argsort(assign, kind='stable')
+        offsets = np.searchsorted(assign[order], np.arange(n_lists + 1))
+        return centroids, offsets, self.pool[order]
+
+    def _ivf_candidates(self, metric, query, n_probe):
+        if metric not in self.ivf:
+            self.ivf[metric] = self._build_ivf(metric)
+        centroids, offsets, rows = self.ivf[metric]
+        point = self._space(metric)[query][None, :]
+        nearest = np.argsort(_centroid_distances(point, centroids)[0])[:n_probe]
+        return np.concatenate([rows[offsets[c]:offsets[c + 1]] for c in nearest])
+
+    def search(self, queries, k=20, metric='cosine', mask=None, n_probe=8):
+        """ The k most similar pool rows for each query row id
+
+        queries are row positions in data (they need not be in the pool and are
+        never returned as their own neighbour); mask is an optional boolean row
+        mask restricting the candidates. Returns (rows, scores), each shaped
+        (len(queries), k) and best first; scores are cosine similarities or
+        Euclidean distances. Queries with fewer than k candidates are padded
+        with row -1 and score NaN.
+        """
+        queries = np.asarray(queries, dtype=np.intp)
+        candidates = self.pool if mask is None else self.pool[mask[self.pool]]
+        rows = np.full((len(queries), k), -1, dtype=np.intp)
+        scores = np.full((len(queries), k), np.nan)
+        if len(candidates) >= self.ivf_min_rows:
+            for i, query in enumerate(queries):
+                probe = self._ivf_candidates(metric, query, n_probe)
+                if mask is not None:
+                    probe = probe[mask[probe]]
+                if len(probe) <= k:
+                    probe = candidates
+                self._fill(metric, queries[i:i + 1], probe, k, rows[i:i + 1], scores[i:i + 1])
+        else:
+            self._fill(metric, queries, candidates, k, rows, scores)
+        if metric == 'euclidean':
+            scores = np.sqrt(np.maximum(-scores, 0))
+        return rows, scores
+
+    def _fill(self, metric, queries, candidates, k, rows, scores):
+        block = self._scores(metric, queries, candidates)
+        # A player is not their own neighbour
+        block[candidates[None, :] == queries[:, None]] = -np.inf
+        top = _top_k(block, k)
+        found = np.take_along_axis(block, top, axis=1)
+        valid = np.isfinite(found)
+        rows[:, :top.shape[1]] = np.where(valid, candidates[top], -1)
+        scores[:, :top.shape[1]] = np.where(valid, found, np.nan)
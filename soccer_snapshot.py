@@ -0,0 +1,69 @@
+"""
+soccer_snapshot.py
+
+Immutable, versioned states of a SOCCERAPI dataset. A Snapshot holds the
+table and everything derived from it (filter indexes, player index, rollup,
+aggregate cube, normalizers, similarity indexes, derived-metric columns). SOCCERAPI reads its current
+snapshot once per call and never changes a published one: loads build a new
+snapshot, deltas derive one copy-on-write, and either is published with a
+single reference swap. Readers therefore see one consistent version without
+locking, and a replaced version is freed as soon as the last call using it
+returns.
+"""
+import copy
+
+from soccer_cube import AggregateCube
+from soccer_index import FilterIndex, PlayerIndex
+from soccer_rollup import PlayerRollup
+
+# get_data levels: one row per club stint, or one season-total row per player
+LEVELS = ('stint', 'player')
+
+
+class Snapshot:
+    """ One version of the loaded data and its derived structures
+
+    source is (filename, load_data keyword arguments), for reloads. rollup
+    is built from data unless given. shared is the SharedTables (see
+    soccer_shm) data was attached from; such snapshots are read-only. The
+    normalizers, similarity and derived dicts are filled lazily by readers;
+    building the same entry twice is harmless.
+    """
+
+    def __init__(self, version=0, data=None, seasons=None, source=None, rollup=None, shared=None):
+        self.version = version
+        self.data = data
+        self.seasons = seasons
+        self.source = source
+        self.shared = shared
+        self.index = self.players = self.rollup = self.rollup_index = self.cube = None
+        self.normalizers = {}
+        self.similarity = {}
+        self.derived = {}
+        if data is not None:
+            self.index = FilterIndex(data)
+            if 'Player' in data.columns:
+                self.players = PlayerIndex(data)
+                self.rollup = PlayerRollup(data) if rollup is None else rollup
+                self.rollup_index = FilterIndex(self.rollup.table)
+            self.cube = AggregateCube(data)
+
+    def derive(self):
+        """ Copy to build the next version from; the derived structures update copy-on-write """
+        snapshot = copy.copy(self)
+        for name in ('index', 'players', 'rollup', 'rollup_index', 'cube'):
+            setattr(snapshot, name, copy.copy(getattr(self, name)))
+        snapshot.normalizers = {level: copy.copy(normalizer) for level, normalizer in self.normalizers.items()}
+        snapshot.similarity = dict(self.similarity)
+        snapshot.derived = {level: copy.copy(derived) for level, derived in self.derived.items()}
+        return snapshot
+
+    def level(self, level):
+        """ (table, FilterIndex) for a get_data level """
+        if level not in LEVELS:
+            raise ValueError(f"level must be one of {LEVELS}, got {level!r}")
+        if level == 'stint':
+            return self.data, self.index
+        if self.rollup is None:
+            raise ValueError("level='player' needs data with a Player column loaded with load_data")
+        return self.rollup.table, self.rollup_index
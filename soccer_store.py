@@ -0,0 +1,218 @@
+"""
+soccer_store.py
+
+Columnar on-disk cache for the player CSVs. Each CSV is converted once into
+one .npy file per column (strings are dictionary-encoded) and read back with
+memory-mapped loads, so repeated runs skip CSV parsing entirely. Reads can be
+restricted to a subset of columns and narrowed to compact dtypes.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIRNAME = '.soccer_cache'
+FORMAT_VERSION = 2
+
+# Low-cardinality text columns that become pandas categories in compact mode
+CATEGORY_COLUMNS = ['Comp', 'Squad', 'Pos', 'Nation']
+
+
+def smallest_int_dtype(lo, hi):
+    """ Return the narrowest signed integer dtype that holds [lo, hi] """
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def compact_frame(df):
+    """ Return df with category, small-int and float32 dtypes where they fit """
+    compact = {}
+    for name in df.columns:
+        col = df[name]
+        if name in CATEGORY_COLUMNS:
+            col = col.astype('category')
+        elif pd.api.types.is_integer_dtype(col.dtype) and len(col):
+            col = col.astype(smallest_int_dtype(col.min(), col.max()))
+        elif pd.api.types.is_float_dtype(col.dtype):
+            col = col.astype(np.float32)
+        compact[name] = col
+    return pd.DataFrame(compact, copy=False)
+
+
+def file_signature(filename, with_hash=True):
+    """ Return the size, mtime and (optionally) sha256 of a file """
+    stat = os.stat(filename)
+    signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        signature['sha256'] = digest.hexdigest()
+    return signature
+
+
+class ColumnarStore:
+    """ Typed, columnar cache of a single CSV file """
+
+    def __init__(self, filename, cache_dir=None):
+        self.filename = os.path.abspath(filename)
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(self.filename), CACHE_DIRNAME)
+        self.root = os.path.join(cache_dir, os.path.basename(self.filename))
+        self.manifest_path = os.path.join(self.root, 'manifest.json')
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('format') != FORMAT_VERSION:
+            return None
+        return manifest
+
+    def _write_manifest(self, manifest):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def manifest(self):
+        """ Return a manifest that matches the current CSV, rebuilding the cache if needed """
+        manifest = self._read_manifest()
+        signature = file_signature(self.filename, with_hash=False)
+        if manifest is not None:
+            source = manifest['source']
+            if source['size'] == signature['size'] and source['mtime_ns'] == signature['mtime_ns']:
+                return manifest
+        # Size or mtime changed, so fall back to the content hash before rebuilding
+        signature = file_signature(self.filename)
+        if manifest is not None and manifest['source']['sha256'] == signature['sha256']:
+            manifest['source'] = signature
+            self._write_manifest(manifest)
+            return manifest
+        return self.build(signature)
+
+    def build(self, signature=None):
+        """ Parse the CSV and write one column file per column """
+        if signature is None:
+            signature = file_signature(self.filename)
+        df = pd.read_csv(self.filename)
+        data_dirname = 'data-' + signature['sha256'][:16]
+        data_dir = os.path.join(self.root, data_dirname)
+        shutil.rmtree(data_dir, ignore_errors=True)
+        os.makedirs(data_dir)
+
+        columns = []
+        for i, name in enumerate(df.columns):
+            col = df[name]
+            entry = {'name': name, 'file': f'{i}.npy', 'dtype': str(col.dtype)}
+            if pd.api.types.is_numeric_dtype(col.dtype):
+                entry['kind'] = 'numeric'
+                values = col.to_numpy()
+                if pd.api.types.is_integer_dtype(col.dtype) and len(col):
+                    entry['min'], entry['max'] = int(values.min()), int(values.max())
+            else:
+                entry['kind'] = 'string'
+                codes, uniques = pd.factorize(col, sort=True)
+                entry['categories'] = [str(u) for u in uniques]
+                values = codes.astype(np.int32)
+            np.save(os.path.join(data_dir, entry['file']), values, allow_pickle=False)
+            columns.append(entry)
+
+        manifest = {'format': FORMAT_VERSION, 'source': signature, 'data_dir': data_dirname,
+                    'rows': len(df), 'columns': columns}
+        self._write_manifest(manifest)
+        # Drop column files left over from older versions of the CSV
+        for name in os.listdir(self.root):
+            if name.startswith('data-') and name != data_dirname:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        return manifest
+
+    def read(self, columns=None, compact=False, rows=None):
+        """ Return the cached table as a DataFrame, optionally restricted to some columns
+
+        With compact=True, CATEGORY_COLUMNS stay dictionary-encoded as pandas
+        categories, integers are narrowed to the smallest dtype that fits and
+        floats are stored as float32. rows (a slice) reads only those rows,
+        indexed by their position in the table.
+        """
+        return self._read(self.manifest(), columns, compact, rows)
+
+    def iter_chunks(self, columns=None, compact=False, chunksize=20000):
+        """ Yield the table chunksize rows at a time; only the current chunk is decoded and resident """
+        manifest = self.manifest()
+        for start in range(0, manifest['rows'], chunksize):
+            yield self._read(manifest, columns, compact, slice(start, start + chunksize))
+
+    def _read(self, manifest, columns, compact, rows):
+        data_dir = os.path.join(self.root, manifest['data_dir'])
+        entries = manifest['columns']
+        if columns is not None:
+            wanted = set(columns)
+            missing = wanted.difference(entry['name'] for entry in entries)
+            if missing:
+                raise ValueError(f"Columns not found in {self.filename}: {sorted(missing)}")
+            entries = [entry for entry in entries if entry['name'] in wanted]
+
+        arrays = {}
+        for entry in entries:
+            # np.asarray keeps the memory-mapped buffer but drops the memmap subclass
+            values = np.asarray(np.load(os.path.join(data_dir, entry['file']), mmap_mode='r', allow_pickle=False))
+            if rows is not None:
+                # Sliced before decoding, so conversions copy the chunk rather than the column
+                values = values[rows]
+            if entry['kind'] == 'string':
+                categories = pd.Index(entry['categories'])
+                values = pd.Categorical.from_codes(values, categories=categories)
+                if not (compact and entry['name'] in CATEGORY_COLUMNS):
+                    values = values.astype(categories.dtype)
+            elif compact and 'min' in entry:
+                values = values.astype(smallest_int_dtype(entry['min'], entry['max']))
+            elif compact and values.dtype.kind == 'f':
+                values = values.astype(np.float32)
+            arrays[entry['name']] = values
+        index = None if rows is None else pd.RangeIndex(manifest['rows'])[rows]
+        return pd.DataFrame(arrays, index=index, copy=False)
+
+
+def read_csv_cached(filename, columns=None, compact=False, cache_dir=None):
+    """ Read a CSV through the columnar cache, falling back to pandas if the cache is unusable """
+    store = ColumnarStore(filename, cache_dir)
+    try:
+        os.makedirs(store.root, exist_ok=True)
+        return store.read(columns, compact)
+    except OSError:
+        return read_csv(filename, columns, compact)
+
+
+def read_csv_chunks(filename, columns=None, compact=False, chunksize=20000, cache_dir=None):
+    """ Yield a CSV chunksize rows at a time through the columnar cache (parsed in chunks if it is unusable)
+
+    Falling back, compact dtypes are chosen per chunk.
+    """
+    store = ColumnarStore(filename, cache_dir)
+    try:
+        os.makedirs(store.root, exist_ok=True)
+        chunks = store.iter_chunks(columns, compact, chunksize)
+        first = next(chunks, None)
+    except OSError:
+        for chunk in pd.read_csv(filename, usecols=columns, chunksize=chunksize):
+            yield compact_frame(chunk) if compact else chunk
+        return
+    if first is not None:
+        yield first
+        yield from chunks
+
+
+def read_csv(filename, columns=None, compact=False):
+    """ Read a CSV directly with pandas, with the same column and dtype options as the cache """
+    df = pd.read_csv(filename, usecols=columns)
+    return compact_frame(df) if compact else df
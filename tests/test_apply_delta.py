@@ -0,0 +1,119 @@
+"""
+test_apply_delta.py
+
+SOCCERAPI.apply_delta updates the indexes, player rollup and cached derived
+state incrementally; after each delta they must match a full rebuild from
+the updated table.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from soccer_api import SOCCERAPI  # noqa: E402
+from soccer_snapshot import Snapshot  # noqa: E402
+
+FULL_CSV = os.path.join(ROOT, 'players_data-2024_2025.csv')
+COLUMNS = ['Player', 'Born', 'Pos', 'Squad', 'Comp', 'Age', 'Min', 'Gls', 'Ast', 'xG', 'Sh', 'Cmp', 'Att', 'Cmp%']
+STATS = ['Gls', 'xG', 'Cmp%']
+
+
+def rebuilt(api):
+    """ SOCCERAPI over a snapshot built from scratch from api's current table """
+    fresh = SOCCERAPI()
+    fresh._publish(Snapshot(data=api.data))
+    return fresh
+
+
+def warm(api):
+    """ Fill the lazily built per-snapshot state that deltas have to carry over """
+    for level in ('stint', 'player'):
+        table = api.get_data(min_goals=0, level=level)
+        for scope in (None, 'Comp', 'position'):
+            api.normalize(table, STATS, method='zscore', scope=scope, level=level)
+        api.get_derived(['Gls/90', 'Conv%'], level=level)
+        api.get_data(min_goals=0, comp='eng Premier League', level=level)
+    api.similar_players(['Max Aarons'], group=['Gls', 'xG', 'Cmp%'], k=5)
+
+
+def assert_index_equal(index, expected):
+    assert index.n_rows == expected.n_rows
+    assert index.bitmaps.keys() == expected.bitmaps.keys()
+    for col, bitmaps in expected.bitmaps.items():
+        assert index.bitmaps[col].keys() == bitmaps.keys(), col
+        for value, bits in bitmaps.items():
+            np.testing.assert_array_equal(index.bitmaps[col][value], bits, err_msg=f'{col}={value}')
+    for col, (values, order) in expected.sorted.items():
+        np.testing.assert_array_equal(index.sorted[col][0], values)
+        # Rows with equal values may be listed in any order
+        actual = index.sorted[col][1]
+        np.testing.assert_array_equal(actual[np.lexsort((actual, values))], order[np.lexsort((order, values))])
+
+
+def assert_matches_rebuild(api):
+    fresh = rebuilt(api)
+    snapshot, expected = api.snapshot, fresh.snapshot
+    assert_index_equal(snapshot.index, expected.index)
+    pd.testing.assert_frame_equal(snapshot.rollup.table, expected.rollup.table, check_dtype=False)
+    np.testing.assert_array_equal(snapshot.rollup.stint_rows, expected.rollup.stint_rows)
+    assert_index_equal(snapshot.rollup_index, expected.rollup_index)
+    pd.testing.assert_frame_equal(api.summarize(by=['Comp', 'Pos', 'AgeBand']),
+                                  fresh.summarize(by=['Comp', 'Pos', 'AgeBand']), check_dtype=False)
+    for level in ('stint', 'player'):
+        for comp in ('eng Premier League', 'es La Liga'):
+            pd.testing.assert_frame_equal(api.get_data(min_goals=0, comp=comp, level=level),
+                                          fresh.get_data(min_goals=0, comp=comp, level=level), check_dtype=False)
+        table = api.get_data(min_goals=0, level=level)
+        for scope in (None, 'Comp', 'position'):
+            pd.testing.assert_frame_equal(api.normalize(table, STATS, method='zscore', scope=scope, level=level),
+                                          fresh.normalize(table, STATS, method='zscore', scope=scope, level=level))
+        pd.testing.assert_frame_equal(api.get_derived(['Gls/90', 'Conv%'], level=level),
+                                      fresh.get_derived(['Gls/90', 'Conv%'], level=level), check_dtype=False)
+    pd.testing.assert_frame_equal(api.similar_players(['Max Aarons'], group=['Gls', 'xG', 'Cmp%'], k=5),
+                                  fresh.similar_players(['Max Aarons'], group=['Gls', 'xG', 'Cmp%'], k=5))
+
+
+@pytest.fixture
+def api():
+    api = SOCCERAPI(FULL_CSV, cache=False, columns=COLUMNS)
+    warm(api)
+    return api
+
+
+@pytest.mark.parametrize('delta', [
+    # More minutes at Bournemouth make it Max Aarons's primary club (Squad, Comp and Pos of his rollup row)
+    {'Player': 'Max Aarons', 'Squad': 'Bournemouth', 'Min': 3000},
+    # Passes completed change his season-total Cmp% but no input Cmp% column
+    {'Player': 'Max Aarons', 'Squad': 'Valencia', 'Cmp': 80},
+    {'Player': 'Max Aarons', 'Squad': 'Valencia', 'Gls': 4, 'xG': 2.5},
+    # He has 0 goals there; 0.5 only equals that after truncation to the int column, so the column widens
+    {'Player': 'Max Aarons', 'Squad': 'Valencia', 'Gls': 0.5},
+    # New row: the rollup is rebuilt
+    {'Player': 'New Player', 'Squad': 'Valencia', 'Comp': 'es La Liga', 'Pos': 'FW', 'Min': 900, 'Gls': 3},
+])
+def test_delta_matches_rebuild(api, delta):
+    result = api.apply_delta(pd.DataFrame([delta]))
+    assert result['updated'] + result['inserted'] == 1
+    assert_matches_rebuild(api)
+
+
+def test_primary_club_follows_minutes(api):
+    api.apply_delta(pd.DataFrame([{'Player': 'Max Aarons', 'Squad': 'Bournemouth', 'Min': 3000}]))
+    totals = api.get_player_totals(['Max Aarons'])
+    assert totals['Comp'].tolist() == ['eng Premier League']
+    assert 'Max Aarons' in api.get_data(min_goals=0, comp='eng Premier League', level='player')['Player'].tolist()
+    assert 'Max Aarons' not in api.get_data(min_goals=0, comp='es La Liga', level='player')['Player'].tolist()
+
+
+def test_unchanged_values_are_not_updates(api):
+    row = api.get_player_rows('Max Aarons').iloc[0]
+    # Same values, in the delta's own dtypes (float64 for an int column)
+    delta = pd.DataFrame([{'Player': 'Max Aarons', 'Squad': row['Squad'], 'Gls': float(row['Gls']), 'xG': row['xG']}])
+    assert api.apply_delta(delta)['updated'] == 0
@@ -0,0 +1,52 @@
+"""
+test_load.py
+
+Projected loads (columns=...) build the same derived structures as full
+loads over whichever columns were read, including the aggregate cube when
+none, or not all, of its dimensions or Min are loaded.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from soccer_api import SOCCERAPI  # noqa: E402
+from soccer_cube import AggregateCube  # noqa: E402
+
+FULL_CSV = os.path.join(ROOT, 'players_data-2024_2025.csv')
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('columns', [
+    ['Gls'],
+    ['Player', 'Nation'],
+    ['Player', 'Gls', 'Min'],
+    # Rates without Min
+    ['Player', 'Squad', 'Comp', 'Save%', 'Cmp%'],
+    ['Player', 'Born', 'Pos', 'Squad', 'Comp', 'Age', 'Min', 'Gls', 'Ast', 'Cmp%'],
+])
+def test_projected_load(columns, compact):
+    api = SOCCERAPI(FULL_CSV, columns=columns, compact=compact)
+    full = pd.read_csv(FULL_CSV, usecols=columns)
+    assert sorted(api.data.columns) == sorted(columns)
+    assert len(api.data) == len(full)
+    total = api.summarize(by=())
+    assert total['count'].tolist() == [len(full)]
+    if 'Gls' in columns:
+        assert total['Gls'].tolist() == [full['Gls'].sum()]
+    if 'Comp' in columns:
+        assert api.summarize(by='Comp')['count'].sum() == len(full)
+
+
+def test_cube_without_dimensions_updates():
+    data = pd.read_csv(FULL_CSV, usecols=['Gls', 'Min'])
+    cube = AggregateCube(data)
+    cube.update(removed=data.iloc[:10], added=data.iloc[:10].assign(Gls=100))
+    expected = data['Gls'].sum() - data['Gls'].iloc[:10].sum() + 1000
+    assert cube.rollup(stats='Gls').to_dict('records') == [{'count': len(data), 'Gls': expected}]
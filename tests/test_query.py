@@ -0,0 +1,78 @@
+"""
+test_query.py
+
+Query plans filters onto the FilterIndex where it can and keeps only the top
+rows of an ordered result with a partial selection; whatever it picks, the
+rows must be those of a plain pandas filter and stable sort.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from soccer_api import SOCCERAPI  # noqa: E402
+
+LIGHT_CSV = os.path.join(ROOT, 'players_data_light-2024_2025.csv')
+
+
+@pytest.fixture(scope='module', params=[(False, False), (True, True)], ids=['csv', 'cached-compact'])
+def api(request):
+    # The cached load reads memory-mapped, read-only columns
+    cache, compact = request.param
+    return SOCCERAPI(LIGHT_CSV, cache=cache, compact=compact)
+
+
+def expected_top(df, column, ascending, n):
+    ordered = df.sort_values(column, ascending=ascending, kind='stable', na_position='last')
+    return ordered if n is None else ordered.head(n)
+
+
+def test_plan_puts_index_lookups_first(api):
+    query = api.query().where('Pos', 'has', 'FW').where('Gls', '>=', 5).where(Comp='es La Liga')
+    steps = [(predicate.column, step) for predicate, step, _, _ in query.plan()]
+    assert steps[:2] in ([('Gls', 'index'), ('Comp', 'index')], [('Comp', 'index'), ('Gls', 'index')])
+    assert steps[2] == ('Pos', 'scan')
+
+
+def test_filters_match_pandas(api):
+    data = api.data
+    result = api.query().where('Gls', 'between', (3, 10)).where('Pos', 'has', 'MF') \
+        .where('Comp', 'in', ['es La Liga', 'it Serie A']).where('xG', '>', 1.5).execute()
+    mask = data['Gls'].between(3, 10) & data['Pos'].astype(str).str.split(',').apply(lambda p: 'MF' in p) \
+        & data['Comp'].isin(['es La Liga', 'it Serie A']) & (data['xG'] > 1.5)
+    pd.testing.assert_frame_equal(result, data[mask])
+
+
+@pytest.mark.parametrize('column', ['Gls', 'xG', 'Age', 'Player', 'Squad'])
+@pytest.mark.parametrize('ascending', [False, True])
+@pytest.mark.parametrize('n', [None, 0, 1, 7, 50, 10 ** 6])
+def test_order_matches_stable_sort(api, column, ascending, n):
+    # Gls has long runs of ties, so most cuts fall inside one
+    query = api.query().where('Min', '>=', 300).order_by(column, ascending=ascending)
+    result = (query if n is None else query.limit(n)).execute()
+    data = api.data
+    pd.testing.assert_frame_equal(result, expected_top(data[data['Min'] >= 300], column, ascending, n))
+
+
+def test_ties_at_the_cut_keep_table_order(api):
+    data = api.data
+    top = expected_top(data, 'Gls', False, 30)
+    # The cut really is inside a run of equal keys
+    assert (data['Gls'] == top['Gls'].iloc[-1]).sum() > (top['Gls'] == top['Gls'].iloc[-1]).sum()
+    result = api.query().order_by('Gls').limit(30).execute()
+    np.testing.assert_array_equal(result.index, top.index)
+
+
+def test_limit_zero(api):
+    assert len(api.query().limit(0).execute()) == 0
+    assert len(api.query().order_by('Gls').limit(0).execute()) == 0
+    assert len(api.query().order_by('Player', ascending=True).limit(0).execute()) == 0
+    with pytest.raises(ValueError):
+        api.query().limit(-1)
@@ -2,6 +2,24 @@
 let allData = [];
 let minGoalsFilter = 0;
 
+// Players sorted by goals (ascending) and their goal counts, built once at load
+let goalsIndex = [];
+let goalsSorted = [];
+// Top 10 by goals per minute of goalsIndex[i..], for each i where a goal count starts
+let topByGoals = new Map();
+const BAR_COUNT = 10;
+const BAR_TRANSITION_MS = 300;
+
+// League of each team name, so the substring matching runs once per team
+const leagueCache = new Map();
+
+function getLeagueCached(team) {
+    if (!leagueCache.has(team)) {
+        leagueCache.set(team, getLeague(team));
+    }
+    return leagueCache.get(team);
+}
+
 // League mapping - maps team names to their leagues
 function getLeague(team) {
     const teamLower = team.toLowerCase();
@@ -85,7 +103,7 @@ d3.csv("players_data_light-2024_2025.csv").then(function(data) {
         d.Pos = d.Pos || "Unknown";
         
         // Assign league and color
-        d.League = getLeague(d.Squad);
+        d.League = getLeagueCached(d.Squad);
         d.LeagueColor = getLeagueColor(d.League);
         
         // Calculate goals per minute
@@ -113,7 +131,8 @@ d3.csv("players_data_light-2024_2025.csv").then(function(data) {
     
     // Filter out players with no minutes played
     allData = data.filter(d => d.Min > 0);
-    
+    buildGoalsIndex();
+
     // Initialize visualizations
     initBarChart();
     initScatterPlot();
@@ -122,18 +141,62 @@ d3.csv("players_data_light-2024_2025.csv").then(function(data) {
     setupSlider();
 });
 
+// Sort players by goals once and keep, for each goal count, the top scorers per minute
+// among players with at least that many goals, so a slider move is a binary search
+function buildGoalsIndex() {
+    const position = new Map(allData.map((d, i) => [d, i]));
+    // Negative when a ranks above b; ties keep the load order
+    const ranksAbove = (a, b) => b.goalsPerMin - a.goalsPerMin || position.get(a) - position.get(b);
+    
+    goalsIndex = allData.slice().sort((a, b) => a.Gls - b.Gls);
+    goalsSorted = goalsIndex.map(d => d.Gls);
+    topByGoals = new Map();
+    
+    let top = [];
+    for (let i = goalsIndex.length - 1; i >= 0; i--) {
+        const d = goalsIndex[i];
+        if (top.length < BAR_COUNT || ranksAbove(d, top[top.length - 1]) < 0) {
+            let j = top.length;
+            while (j > 0 && ranksAbove(d, top[j - 1]) < 0) j--;
+            top.splice(j, 0, d);
+            if (top.length > BAR_COUNT) top.pop();
+        }
+        if (i === 0 || goalsSorted[i - 1] !== goalsSorted[i]) {
+            topByGoals.set(i, top.slice());
+        }
+    }
+}
+
+// Top players by goals per minute with at least minGoals goals
+function topScorers(minGoals) {
+    const start = d3.bisectLeft(goalsSorted, minGoals);
+    return topByGoals.get(start) || [];
+}
+
 // Setup slider for bar chart
 function setupSlider() {
     const slider = d3.select("#goalsSlider");
     const valueDisplay = d3.select("#minGoalsValue");
+    let pendingFrame = null;
     
     slider.on("input", function() {
         minGoalsFilter = +this.value;
         valueDisplay.text(minGoalsFilter);
-        updateBarChart();
+        // Redraw at most once per animation frame, with the latest value
+        if (pendingFrame === null) {
+            pendingFrame = requestAnimationFrame(function() {
+                pendingFrame = null;
+                updateBarChart();
+            });
+        }
     });
 }
 
+// Bars are keyed by player and team, so a player who changed clubs gets one bar per stint
+function barKey(d) {
+    return `${d.Player}|${d.Squad}`;
+}
+
 // Initialize Bar Chart
 function initBarChart() {
     const margin = {top: 40, right: 80, bottom: 60, left: 100};
@@ -151,134 +214,157 @@ function initBarChart() {
     const g = svg.append("g")
         .attr("transform", `translate(${margin.left},${margin.top})`);
     
-    // Store SVG and g for updates
+    // Axes, bar and label layers are created once; updates only join data into them
+    const xAxisG = g.append("g")
+        .attr("class", "axis")
+        .attr("transform", `translate(0,${height})`);
+    
+    xAxisG.append("text")
+        .attr("class", "axis-label")
+        .attr("x", width / 2)
+        .attr("y", 45)
+        .attr("text-anchor", "middle")
+        .text("Goals per Minute");
+    
+    const yAxisG = g.append("g")
+        .attr("class", "axis");
+    
+    const barsG = g.append("g");
+    const labelsG = g.append("g");
+    
+    const emptyMessage = g.append("text")
+        .attr("x", width / 2)
+        .attr("y", height / 2)
+        .attr("text-anchor", "middle")
+        .attr("font-size", "18px")
+        .attr("fill", "#999")
+        .style("display", "none")
+        .text("No players match the filter criteria");
+    
+    // Store SVG, g and layers for updates
     window.barChartSVG = svg;
     window.barChartG = g;
     window.barChartMargin = margin;
     window.barChartWidth = width;
     window.barChartHeight = height;
+    window.barChartLayers = {xAxisG, yAxisG, barsG, labelsG, emptyMessage};
+    window.barChartShown = null;
+    
+    // The legend lists every league and does not depend on the filter
+    addBarChartLegend(g, width, height, margin);
     
     updateBarChart();
 }
 
 // Update Bar Chart based on filter
 function updateBarChart() {
-    const margin = window.barChartMargin;
     const width = window.barChartWidth;
     const height = window.barChartHeight;
-    const g = window.barChartG;
-    
-    // Filter data based on minimum goals
-    const filteredData = allData
-        .filter(d => d.Gls >= minGoalsFilter)
-        .sort((a, b) => b.goalsPerMin - a.goalsPerMin)
-        .slice(0, 10);
-    
-    // Remove previous elements
-    g.selectAll(".bar").remove();
-    g.selectAll(".axis").remove();
-    g.selectAll("text.bar-label").remove();
-    g.selectAll(".legend").remove();
-    
-    if (filteredData.length === 0) {
-        g.append("text")
-            .attr("x", width / 2)
-            .attr("y", height / 2)
-            .attr("text-anchor", "middle")
-            .attr("font-size", "18px")
-            .attr("fill", "#999")
-            .text("No players match the filter criteria");
-        return;
-    }
+    const {xAxisG, yAxisG, barsG, labelsG, emptyMessage} = window.barChartLayers;
+    
+    const filteredData = topScorers(minGoalsFilter);
+    // Thresholds between two goal counts select the same players
+    if (filteredData === window.barChartShown) return;
+    window.barChartShown = filteredData;
+    
+    const isEmpty = filteredData.length === 0;
+    emptyMessage.style("display", isEmpty ? null : "none");
+    xAxisG.style("display", isEmpty ? "none" : null);
+    yAxisG.style("display", isEmpty ? "none" : null);
     
     // Scales
     const xScale = d3.scaleLinear()
-        .domain([0, d3.max(filteredData, d => d.goalsPerMin)])
+        .domain([0, d3.max(filteredData, d => d.goalsPerMin) || 0])
         .range([0, width])
         .nice();
     
     const yScale = d3.scaleBand()
-        .domain(filteredData.map(d => d.Player))
+        .domain(filteredData.map(barKey))
         .range([0, height])
         .padding(0.2);
     
+    const playerNames = new Map(filteredData.map(d => [barKey(d), d.Player]));
+    const t = d3.transition().duration(BAR_TRANSITION_MS);
+    
     // X-axis
     const xAxis = d3.axisBottom(xScale)
         .tickFormat(d3.format(".6f"));
     
-    g.append("g")
-        .attr("class", "axis")
-        .attr("transform", `translate(0,${height})`)
-        .call(xAxis)
-        .append("text")
-        .attr("class", "axis-label")
-        .attr("x", width / 2)
-        .attr("y", 45)
-        .attr("text-anchor", "middle")
-        .text("Goals per Minute");
+    xAxisG.transition(t).call(xAxis);
     
     // Y-axis
-    const yAxis = d3.axisLeft(yScale);
+    const yAxis = d3.axisLeft(yScale)
+        .tickFormat(key => playerNames.get(key));
     
-    g.append("g")
-        .attr("class", "axis")
-        .call(yAxis)
-        .selectAll("text")
+    yAxisG.transition(t).call(yAxis);
+    yAxisG.selectAll(".tick text")
         .style("font-size", "11px");
     
     // Tooltip
     const tooltip = d3.select("#tooltip");
     
     // Bars
-    const bars = g.selectAll(".bar")
-        .data(filteredData)
-        .enter()
-        .append("rect")
-        .attr("class", "bar")
-        .attr("x", 0)
-        .attr("y", d => yScale(d.Player))
+    barsG.selectAll(".bar")
+        .data(filteredData, barKey)
+        .join(
+            enter => enter.append("rect")
+                .attr("class", "bar")
+                .attr("x", 0)
+                .attr("y", d => yScale(barKey(d)))
+                .attr("width", 0)
+                .attr("height", yScale.bandwidth())
+                .attr("fill", d => d.LeagueColor)
+                .on("mouseover", function(event, d) {
+                    d3.select(this)
+                        .attr("opacity", 0.8);
+                    tooltip
+                        .style("opacity", 1)
+                        .html(`
+                            <strong>${d.Player}</strong><br/>
+                            Team: ${d.Squad}<br/>
+                            League: ${d.League}<br/>
+                            Position: ${d.Pos}<br/>
+                            Goals: ${d.Gls}<br/>
+                            Minutes: ${d.Min}<br/>
+                            Goals/Min: ${d.goalsPerMin.toFixed(6)}<br/>
+                            Goals/90: ${(d.Gls / d["90s"]).toFixed(2)}
+                        `)
+                        .style("left", (event.pageX + 10) + "px")
+                        .style("top", (event.pageY - 10) + "px");
+                })
+                .on("mouseout", function() {
+                    d3.select(this)
+                        .attr("opacity", 1);
+                    tooltip.style("opacity", 0);
+                }),
+            update => update,
+            exit => exit.transition(t)
+                .attr("width", 0)
+                .remove()
+        )
+        .transition(t)
+        .attr("y", d => yScale(barKey(d)))
         .attr("width", d => xScale(d.goalsPerMin))
-        .attr("height", yScale.bandwidth())
-        .attr("fill", d => d.LeagueColor)
-        .on("mouseover", function(event, d) {
-            d3.select(this)
-                .attr("opacity", 0.8);
-            tooltip
-                .style("opacity", 1)
-                .html(`
-                    <strong>${d.Player}</strong><br/>
-                    Team: ${d.Squad}<br/>
-                    League: ${d.League}<br/>
-                    Position: ${d.Pos}<br/>
-                    Goals: ${d.Gls}<br/>
-                    Minutes: ${d.Min}<br/>
-                    Goals/Min: ${d.goalsPerMin.toFixed(6)}<br/>
-                    Goals/90: ${(d.Gls / d["90s"]).toFixed(2)}
-                `)
-                .style("left", (event.pageX + 10) + "px")
-                .style("top", (event.pageY - 10) + "px");
-        })
-        .on("mouseout", function() {
-            d3.select(this)
-                .attr("opacity", 1);
-            tooltip.style("opacity", 0);
-        });
+        .attr("height", yScale.bandwidth());
     
     // Value labels on bars
-    g.selectAll("text.bar-label")
-        .data(filteredData)
-        .enter()
-        .append("text")
-        .attr("class", "bar-label")
+    labelsG.selectAll("text.bar-label")
+        .data(filteredData, barKey)
+        .join(
+            enter => enter.append("text")
+                .attr("class", "bar-label")
+                .attr("x", 5)
+                .attr("y", d => yScale(barKey(d)) + yScale.bandwidth() / 2)
+                .attr("dy", "0.35em")
+                .attr("font-size", "10px")
+                .attr("fill", "#333")
+                .text(d => `${d.Gls} goals`),
+            update => update,
+            exit => exit.remove()
+        )
+        .transition(t)
         .attr("x", d => xScale(d.goalsPerMin) + 5)
-        .attr("y", d => yScale(d.Player) + yScale.bandwidth() / 2)
-        .attr("dy", "0.35em")
-        .attr("font-size", "10px")
-        .attr("fill", "#333")
-        .text(d => `${d.Gls} goals`);
-    
-    // Add legend for bar chart
-    addBarChartLegend(g, width, height, margin);
+        .attr("y", d => yScale(barKey(d)) + yScale.bandwidth() / 2);
 }
 
 // Add legend for bar chart